@@ -19,6 +19,7 @@ from src.routes.category.models import Category
 from src.routes.ticket.models import Ticket
 from src.routes.setting.models import Settings
 from src.routes.global_counter.models import Counter
+from src.routes.statistics.models import TicketDailyStats, TicketTotals, RatingStats
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,121 @@
+"""partition tickets by month
+
+Revision ID: 16888566a239
+Revises: 51390f1bedf9
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '16888566a239'
+down_revision = '51390f1bedf9'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('tickets_id_seq'),
+    full_name VARCHAR NOT NULL,
+    phone_number VARCHAR NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    created_day DATE NOT NULL,
+    start_time TIMESTAMP WITHOUT TIME ZONE,
+    end_time TIMESTAMP WITHOUT TIME ZONE,
+    category_id INTEGER NOT NULL REFERENCES categories (id),
+    status VARCHAR NOT NULL,
+    rate INTEGER,
+    number VARCHAR NOT NULL,
+    language VARCHAR NOT NULL,
+    worker_id INTEGER REFERENCES users (id),
+    telegram_id BIGINT,
+    token VARCHAR,
+    PRIMARY KEY (id, created_day)
+"""
+
+INDEXES = [
+    ('ix_tickets_id', ['id'], None, False),
+    ('ix_tickets_wait_queue', ['category_id', 'created_at', 'id'], "status = 'wait'", False),
+    ('ix_tickets_invited_worker', ['worker_id'], "status = 'invited'", False),
+    ('ix_tickets_invited_category', ['category_id', 'created_at'], "status = 'invited'", False),
+    ('ix_tickets_category_status_created', ['category_id', 'status', 'created_at'], None, False),
+    ('ix_tickets_worker_status_created', ['worker_id', 'status', 'created_at'], None, False),
+    ('ix_tickets_created_at', ['created_at'], None, False),
+    ('ix_tickets_token', ['token'], None, False),
+    ('uq_tickets_waiting_client', ['full_name', 'phone_number', 'category_id', 'created_day'], "status = 'wait'", True),
+]
+
+# One partition per month that has tickets, plus the current and next two months
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT DISTINCT date_trunc('month', created_day)::date FROM tickets_legacy
+        UNION
+        SELECT (date_trunc('month', CURRENT_DATE) + make_interval(months => i))::date
+        FROM generate_series(0, 2) AS i
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+            '{table}_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+            month, (month + interval '1 month')::date
+        );
+    END LOOP;
+END $$
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tickets RENAME TO tickets_legacy")
+    op.execute("ALTER SEQUENCE tickets_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE tickets_legacy ADD COLUMN created_day DATE")
+    op.execute("UPDATE tickets_legacy SET created_day = COALESCE(created_at::date, CURRENT_DATE)")
+
+    op.execute(f"CREATE TABLE tickets ({COLUMNS}) PARTITION BY RANGE (created_day)")
+    op.execute(CREATE_PARTITIONS.replace('{table}', 'tickets'))
+    op.execute("""
+        INSERT INTO tickets (id, full_name, phone_number, created_at, created_day, start_time, end_time,
+                             category_id, status, rate, number, language, worker_id, telegram_id, token)
+        SELECT id, full_name, phone_number, created_at, created_day, start_time, end_time,
+               category_id, status, rate, number, language, worker_id, telegram_id, token
+        FROM tickets_legacy
+    """)
+
+    # Detached partitions are attached here once they fall out of the retention window
+    op.execute(
+        "CREATE TABLE tickets_archive (LIKE tickets INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_day)"
+    )
+
+    op.execute("DROP TABLE tickets_legacy")
+    op.execute("ALTER SEQUENCE tickets_id_seq OWNED BY tickets.id")
+
+    for name, columns, where, unique in INDEXES:
+        op.create_index(
+            name, 'tickets', columns, unique=unique,
+            postgresql_where=sa.text(where) if where else None,
+        )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE tickets RENAME TO tickets_partitioned")
+    op.execute("ALTER SEQUENCE tickets_id_seq OWNED BY NONE")
+    op.execute(f"CREATE TABLE tickets ({COLUMNS.replace('PRIMARY KEY (id, created_day)', 'PRIMARY KEY (id)')})")
+    op.execute("INSERT INTO tickets SELECT * FROM tickets_partitioned")
+    op.execute("INSERT INTO tickets SELECT * FROM tickets_archive")
+    op.execute("DROP TABLE tickets_partitioned")
+    op.execute("DROP TABLE tickets_archive")
+    op.execute("ALTER TABLE tickets DROP COLUMN created_day")
+    op.execute("ALTER SEQUENCE tickets_id_seq OWNED BY tickets.id")
+
+    for name, columns, where, unique in INDEXES:
+        if 'created_day' in columns:
+            columns = [column for column in columns if column != 'created_day']
+        op.create_index(
+            name, 'tickets', columns, unique=unique,
+            postgresql_where=sa.text(where) if where else None,
+        )
@@ -0,0 +1,55 @@
+"""rating stats
+
+Revision ID: 3a9e6c1d8f52
+Revises: e81c3f5a07d4
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a9e6c1d8f52'
+down_revision = 'e81c3f5a07d4'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL = """
+WITH all_tickets AS (
+    SELECT category_id, worker_id, rate FROM tickets
+    UNION ALL SELECT category_id, worker_id, rate FROM tickets_archive
+)
+INSERT INTO rating_stats
+SELECT scope, scope_id, sum(rate), count(*),
+       count(*) FILTER (WHERE rate = 1), count(*) FILTER (WHERE rate = 2),
+       count(*) FILTER (WHERE rate = 3), count(*) FILTER (WHERE rate = 4),
+       count(*) FILTER (WHERE rate = 5)
+FROM (
+    SELECT 'category' AS scope, category_id AS scope_id, rate FROM all_tickets WHERE rate IS NOT NULL
+    UNION ALL
+    SELECT 'worker', worker_id, rate FROM all_tickets WHERE rate IS NOT NULL AND worker_id IS NOT NULL
+) AS rated
+GROUP BY scope, scope_id
+"""
+
+
+def upgrade() -> None:
+    op.create_table('rating_stats',
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rate_1', sa.Integer(), nullable=False),
+    sa.Column('rate_2', sa.Integer(), nullable=False),
+    sa.Column('rate_3', sa.Integer(), nullable=False),
+    sa.Column('rate_4', sa.Integer(), nullable=False),
+    sa.Column('rate_5', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'scope_id')
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table('rating_stats')
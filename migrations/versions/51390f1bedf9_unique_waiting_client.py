@@ -0,0 +1,41 @@
+"""unique waiting client
+
+Revision ID: 51390f1bedf9
+Revises: 89b16a6c0c8c
+Create Date: 2026-10-18 11:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '51390f1bedf9'
+down_revision = '89b16a6c0c8c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the oldest of any duplicate waiting tickets, otherwise the unique index cannot be built
+    op.execute("""
+        UPDATE tickets SET status = 'cancelled'
+        WHERE status = 'wait' AND id NOT IN (
+            SELECT min(id) FROM tickets
+            WHERE status = 'wait'
+            GROUP BY full_name, phone_number, category_id
+        )
+    """)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_tickets_waiting_client', 'tickets', ['full_name', 'phone_number', 'category_id'],
+            unique=True,
+            postgresql_where=sa.text("status = 'wait'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_tickets_waiting_client', table_name='tickets', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,55 @@
+"""ticket keyset indexes
+
+Revision ID: 7d2f9b41e6a0
+Revises: c4e7a0d2b915
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2f9b41e6a0'
+down_revision = 'c4e7a0d2b915'
+branch_labels = None
+depends_on = None
+
+
+def create_partitioned_index(name: str, columns: list[str], suffix: str) -> None:
+    # tickets is partitioned, so CONCURRENTLY cannot be used on the parent. The
+    # parent index is created empty (ON ONLY), each partition's index is built
+    # CONCURRENTLY and attached, and the parent index becomes valid once every
+    # partition has one. Ticket writes are never blocked by the builds.
+    if context.is_offline_mode():
+        # The partitions are only known on a live database; a generated script
+        # builds the index on the parent, which locks tickets against writes
+        op.execute(f"CREATE INDEX {name} ON tickets ({', '.join(columns)})")
+        return
+    op.execute(f"CREATE INDEX {name} ON ONLY tickets ({', '.join(columns)})")
+    with op.get_context().autocommit_block():
+        partitions = op.get_bind().execute(sa.text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'tickets'::regclass ORDER BY c.relname"
+        )).scalars().all()
+        for partition in partitions:
+            partition_index = f"{partition}_{suffix}_idx"
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} ({', '.join(columns)})")
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def replace_created_at_index(columns: list[str], suffix: str) -> None:
+    # Build the new index under a temporary name, then swap it in
+    create_partitioned_index('ix_tickets_created_at_new', columns, suffix)
+    op.drop_index('ix_tickets_created_at', table_name='tickets')
+    op.execute("ALTER INDEX ix_tickets_created_at_new RENAME TO ix_tickets_created_at")
+
+
+def upgrade() -> None:
+    replace_created_at_index(['created_at', 'id'], 'created_at_id')
+    create_partitioned_index('ix_tickets_worker_created', ['worker_id', 'created_at', 'id'], 'worker_id_created_at_id')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_worker_created', table_name='tickets')
+    replace_created_at_index(['created_at'], 'created_at')
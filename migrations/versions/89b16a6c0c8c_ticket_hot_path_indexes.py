@@ -0,0 +1,46 @@
+"""ticket hot path indexes
+
+Revision ID: 89b16a6c0c8c
+Revises: 294dd9b53398
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '89b16a6c0c8c'
+down_revision = '294dd9b53398'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_tickets_wait_queue', ['category_id', 'created_at', 'id'], "status = 'wait'"),
+    ('ix_tickets_invited_worker', ['worker_id'], "status = 'invited'"),
+    ('ix_tickets_invited_category', ['category_id', 'created_at'], "status = 'invited'"),
+    ('ix_tickets_category_status_created', ['category_id', 'status', 'created_at'], None),
+    ('ix_tickets_worker_status_created', ['worker_id', 'status', 'created_at'], None),
+    ('ix_tickets_created_at', ['created_at'], None),
+    ('ix_tickets_token', ['token'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not
+    # block ticket inserts while the indexes are built
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name, 'tickets', columns, unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tickets', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,39 @@
+"""ticket daily stats
+
+Revision ID: c4e7a0d2b915
+Revises: 16888566a239
+Create Date: 2026-10-18 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a0d2b915'
+down_revision = '16888566a239'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ticket_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('total_service_seconds', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'category_id', 'worker_id', 'status')
+    )
+    op.execute(
+        "INSERT INTO ticket_daily_stats "
+        "SELECT created_day, category_id, COALESCE(worker_id, 0), status, count(*), "
+        "COALESCE(sum(extract(epoch FROM end_time - start_time)) "
+        "FILTER (WHERE status = 'completed' AND start_time IS NOT NULL AND end_time IS NOT NULL), 0) "
+        "FROM tickets GROUP BY 1, 2, 3, 4"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ticket_daily_stats')
@@ -0,0 +1,36 @@
+"""ticket totals
+
+Revision ID: e81c3f5a07d4
+Revises: 7d2f9b41e6a0
+Create Date: 2026-10-18 17:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81c3f5a07d4'
+down_revision = '7d2f9b41e6a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ticket_totals',
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category_id', 'status')
+    )
+    op.execute(
+        "INSERT INTO ticket_totals "
+        "SELECT category_id, status, count(*) FROM ("
+        "SELECT category_id, status FROM tickets "
+        "UNION ALL SELECT category_id, status FROM tickets_archive"
+        ") AS all_tickets GROUP BY category_id, status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ticket_totals')
@@ -17,4 +17,27 @@ SMTP_PASSWORD = os.environ.get("PASSWORD")
 SMTP_DOMAIN = os.environ.get("DOMAIN")
 
 FRONT_DOMAIN = os.environ.get("FRONT_DOMAIN")
-TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN")
\ No newline at end of file
+TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN")
+
+# Months of ticket history kept in the tickets table before partitions are moved to tickets_archive
+TICKETS_ARCHIVE_AFTER_MONTHS = os.environ.get("TICKETS_ARCHIVE_AFTER_MONTHS")
+
+# Seconds the admin statistics responses are cached between ticket status changes
+STATISTICS_CACHE_TTL = float(os.environ.get("STATISTICS_CACHE_TTL", 5))
+
+# Websocket fan-out: per-connection outbound queue size, seconds allowed for a single send,
+# and seconds a connection may stay with a full queue before it is dropped
+WS_QUEUE_SIZE = int(os.environ.get("WS_QUEUE_SIZE", 256))
+WS_SEND_TIMEOUT = float(os.environ.get("WS_SEND_TIMEOUT", 5))
+WS_SLOW_CONSUMER_DEADLINE = float(os.environ.get("WS_SLOW_CONSUMER_DEADLINE", 10))
+
+# PostgreSQL NOTIFY channel that carries websocket broadcasts and queue index changes between worker processes
+WS_BACKPLANE_CHANNEL = os.environ.get("WS_BACKPLANE_CHANNEL", "queue_events")
+
+# Negotiate permessage-deflate with websocket clients. Cuts the bytes of large general_queue
+# snapshots, but every frame is then compressed separately for each connection.
+WS_PER_MESSAGE_DEFLATE = os.environ.get("WS_PER_MESSAGE_DEFLATE", "true").lower() in ("1", "true", "yes")
+
+# Seconds websocket events are buffered and merged before being sent as one batch frame
+# per client (0.05-0.1 smooths the morning rush); 0 sends every event immediately
+WS_COALESCE_TICK = float(os.environ.get("WS_COALESCE_TICK", 0))
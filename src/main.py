@@ -11,13 +11,19 @@ sys.path.append(os.path.join(sys.path[0], '../'))
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.database import async_session_maker
 from src.routes.setting.models import Settings
 from src.routes.interface.router import router as interface_router
 from src.routes.setting.router import router as setting_router
 from src.routes.ticket.router import router as ticket_router
 from src.routes.category.router import router as category_router
-from src.routes.websocket.router import router as websocket_router
+from src.routes.websocket.router import router as websocket_router, manager
+from src.routes.websocket.backplane import backplane
 from src.routes.auth.router import router as auth_router
+from src.routes.ticket.queue import queue_index
+from src.routes.ticket.estimator import service_time_estimator
+from src.routes.ticket.partitions import ensure_partitions
+from src.config import WS_PER_MESSAGE_DEFLATE
 import logging
 
 
@@ -42,6 +48,40 @@ app.include_router(ticket_router)
 app.include_router(interface_router)
 app.include_router(setting_router)
 
+
+async def rebuild_from_database():
+    async with async_session_maker() as session:
+        await queue_index.rebuild(session)
+        await service_time_estimator.rebuild(session)
+
+
+@app.on_event("startup")
+async def startup():
+    async with async_session_maker() as session:
+        await ensure_partitions(session)
+
+    # Build the queue index and service time estimates now, so they are served even if
+    # LISTEN is still failing when backplane.start() gives up waiting
+    await rebuild_from_database()
+
+    # Keep the workers' websocket clients, queue indexes and service time estimates in step
+    # with each other. LISTEN comes first and every (re)connect rebuilds them from the
+    # database, so no change is missed.
+    backplane.subscribe("broadcast", lambda event: manager.deliver(event["message"], event["topics"], event["key"]))
+    backplane.subscribe("queue", queue_index.apply_event)
+    backplane.subscribe("service_time", service_time_estimator.apply_event)
+    backplane.on_listen.append(rebuild_from_database)
+    queue_index.listeners.append(lambda event: backplane.publish("queue", event))
+    service_time_estimator.listeners.append(lambda event: backplane.publish("service_time", event))
+    manager.backplane = backplane
+    await backplane.start()
+
+
+@app.on_event("shutdown")
+async def stop_backplane():
+    await backplane.stop()
+
 if __name__ == "__main__":
     logging.info("Starting application...")
-    uvicorn.run('main:app', host="0.0.0.0", port=8000, reload=True, workers=3)
+    uvicorn.run('main:app', host="0.0.0.0", port=8000, reload=True, workers=3,
+                ws_per_message_deflate=WS_PER_MESSAGE_DEFLATE)
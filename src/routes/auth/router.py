@@ -12,6 +12,7 @@ from fastapi import APIRouter
 from src.routes.auth.auth import decode_nextauth_session, get_google_user_info, get_user_by_email
 from src.routes.auth.models import User
 from src.routes.category.models import Category
+from src.routes.category.directory import category_directory
 from src.utils.mail import send_new_pass, send_pass
 
 router = APIRouter(
@@ -66,6 +67,7 @@ async def register(request: Request, user: schemas.UserCreate, db: AsyncSession
     db.add(db_user)
     await send_pass(user.email, password, user.window, user.first_name)
     await db.commit()
+    category_directory.invalidate()
     await db.refresh(db_user)
     return db_user
 
@@ -91,6 +93,7 @@ async def login_for_access_token(request: Request, db: AsyncSession = Depends(ge
     user.token = token
     db.add(user)
     await db.commit()
+    category_directory.invalidate()
     await db.refresh(user)
     return user
 
@@ -115,6 +118,7 @@ async def login_for_access_token_google(request: Request, db: AsyncSession = Dep
     user.token = token
     db.add(user)
     await db.commit()
+    category_directory.invalidate()
     await db.refresh(user)
     return user
 
@@ -193,6 +197,7 @@ async def update_user(
 
     db.add(user)
     await db.commit()
+    category_directory.invalidate()
     await db.refresh(user)
     return user
 
@@ -233,6 +238,7 @@ async def delete_user(
 
     await db.delete(user)
     await db.commit()
+    category_directory.invalidate()
     return {"message": "User deleted successfully"}
 
 @router.post("/forget-password")
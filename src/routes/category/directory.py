@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from src.routes.auth.models import User
+from src.routes.auth.schemas import UserOut
+from src.routes.category.models import Category
+from src.schemas import CategoryResponse
+
+
+class CategoryDirectory:
+    """In-process cache of the category -> users graph used by the admin pages.
+
+    The graph is loaded with two queries (categories plus a ``selectinload`` of
+    their users) regardless of the number of categories. Category and user
+    mutation endpoints call ``invalidate``; ``ttl`` bounds how long another
+    worker process can serve a stale copy.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self.version = 0
+        self.loaded_at = 0.0
+        self.entries: Optional[List[CategoryResponse]] = None
+        self.unassigned_users: List[UserOut] = []
+        self.lock = asyncio.Lock()
+
+    def invalidate(self):
+        self.version += 1
+        self.entries = None
+
+    async def categories(self, db: AsyncSession) -> List[CategoryResponse]:
+        entries, _ = await self._load(db)
+        return entries
+
+    async def unassigned(self, db: AsyncSession) -> List[UserOut]:
+        """Non-admin users that are not attached to any category."""
+        _, unassigned = await self._load(db)
+        return unassigned
+
+    def _fresh(self) -> bool:
+        return self.entries is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    async def _load(self, db: AsyncSession) -> Tuple[List[CategoryResponse], List[UserOut]]:
+        if self._fresh():
+            return self.entries, self.unassigned_users
+        async with self.lock:
+            if self._fresh():
+                return self.entries, self.unassigned_users
+            version = self.version
+            result = await db.execute(
+                select(Category).options(selectinload(Category.users)).order_by(Category.id)
+            )
+            entries = [
+                CategoryResponse(
+                    id=category.id,
+                    name=category.name,
+                    users=[UserOut.from_orm(user) for user in category.users]
+                )
+                for category in result.scalars().all()
+            ]
+            unassigned_result = await db.execute(
+                select(User).where(User.category_id == None, User.is_admin == False)
+            )
+            unassigned = [UserOut.from_orm(user) for user in unassigned_result.scalars().all()]
+            # An invalidation that raced with the load wins; the next caller reloads
+            if version == self.version:
+                self.entries = entries
+                self.unassigned_users = unassigned
+                self.loaded_at = time.monotonic()
+            return entries, unassigned
+
+
+category_directory = CategoryDirectory()
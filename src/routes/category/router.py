@@ -1,20 +1,23 @@
-from datetime import datetime
+from typing import Optional
 from fastapi import Depends, HTTPException, logger, status, APIRouter, Request
-import pytz
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from src.database import get_async_session
 from src.routes.auth import auth
 from src.routes.category.schemas import CategoryCreate, CategoryOutput, CategoryUpdate
 from src.routes.category.models import Category
+from src.routes.category.directory import category_directory
+from src.routes.statistics.ratings import get_rating
 from src.routes.auth.models import User
 from src.routes.auth.schemas import UserOut
 from src.routes.ticket.models import Ticket
-from src.routes.ticket.schemas import TicketOut
-from src.routes.ticket.ticket import create_ticket, update_ticket, delete_ticket, get_tickets, get_ticket
+from src.routes.ticket.schemas import TicketOut, TicketPage
+from src.routes.ticket.serialization import select_ticket_rows, ticket_page_response
+from src.routes.ticket.ticket import create_ticket, update_ticket, delete_ticket, get_tickets, get_ticket, \
+    dispatch_next_ticket
 from src.routes.websocket.router import manager
 from src.schemas import CurrentTicketWorker
+from src.utils.pagination import DEFAULT_PAGE_SIZE, paginate_tickets
 from telegram_bot.main import dp
 
 
@@ -29,6 +32,7 @@ async def create_category(category: CategoryCreate, db: AsyncSession = Depends(g
     new_category = Category(**category.dict())
     db.add(new_category)
     await db.commit()
+    category_directory.invalidate()
     await db.refresh(new_category)
     return new_category
 
@@ -47,6 +51,7 @@ async def update_category(category_id: int, category: CategoryUpdate, db: AsyncS
 
     db.add(db_category)
     await db.commit()
+    category_directory.invalidate()
     await db.refresh(db_category)
     return db_category
 
@@ -62,6 +67,7 @@ async def delete_category(category_id: int, db: AsyncSession = Depends(get_async
 
     await db.delete(db_category)
     await db.commit()
+    category_directory.invalidate()
     return {"message": "Category deleted successfully"}
 
 
@@ -86,16 +92,13 @@ async def get_category(category_id: int, db: AsyncSession = Depends(get_async_se
 
 @router.get("/all/users", response_model=list[dict])
 async def get_all_users(db: AsyncSession = Depends(get_async_session)):
-    result = await db.execute(select(Category))
-    categories = result.scalars().all()
+    categories = await category_directory.categories(db)
 
     response = []
     for category in categories:
-        users = await db.execute(select(User).where(User.category_id == category.id))
-        users = users.scalars().all()
         response.append({
-            "category": CategoryOutput.from_orm(category).dict(),
-            "users": [UserOut.from_orm(user).dict() for user in users]
+            "category": {"id": category.id, "name": category.name},
+            "users": [user.dict() for user in category.users]
         })
 
     return response
@@ -108,12 +111,13 @@ async def get_users_by_id(category_id: int, db: AsyncSession = Depends(get_async
     return [UserOut.from_orm(user) for user in users]
 
 
-@router.get("/{category_id}/tickets", response_model=list[TicketOut])
-async def get_tickets_by_id(category_id: int, db: AsyncSession = Depends(get_async_session)):
-    result = await db.execute(
-        select(Ticket).order_by(Ticket.id).where(Ticket.category_id == category_id, Ticket.status == "wait"))
-    tickets = result.scalars().all()
-    return [TicketOut.from_orm(ticket) for ticket in tickets]
+@router.get("/{category_id}/tickets", response_model=TicketPage)
+async def get_tickets_by_id(category_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                            db: AsyncSession = Depends(get_async_session)):
+    # Queue order, oldest first
+    query = select_ticket_rows().where(Ticket.category_id == category_id, Ticket.status == "wait")
+    tickets, next_cursor = await paginate_tickets(db, query, cursor, limit, descending=False)
+    return ticket_page_response(tickets, next_cursor)
 
 
 @router.post("/ticket/next", response_model=CurrentTicketWorker)
@@ -122,9 +126,6 @@ async def get_next_ticket(request: Request,
     data = await request.json()  # Получаем JSON данные из запроса
     worker_token = data.get("token")  # Извлекаем токен сотрудника
 
-    tz = pytz.timezone('Asia/Almaty')  # Устанавливаем часовой пояс для Алматы
-    # Получаем текущее время и дату и делаем её timezone-naive
-    now = datetime.now(tz).replace(tzinfo=None)
     if worker_token is None:  # Проверяем наличие токена
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
@@ -132,61 +133,16 @@ async def get_next_ticket(request: Request,
     # Аутентифицируем пользователя по токену
     worker: UserOut = await auth.get_current_user(db, worker_token)
 
-    current_ticket = await db.execute(
-        select(Ticket).where(Ticket.worker_id ==
-                             worker.id, Ticket.status == "invited")
-    )
-    # Получаем текущий билет, назначенный сотруднику
-    current_ticket = current_ticket.scalars().first()
-    if current_ticket:
-        current_ticket.status = "completed"  # Обновляем статус билета на "completed"
-        current_ticket.end_time = now  # Устанавливаем время завершения билета
-        db.add(current_ticket)
-        await db.commit()
-        await db.refresh(current_ticket)
-        today = now.date()  # Получаем текущую дату
-
-        # completed_tickets_res = await db.execute(
-        #   select(Ticket).order_by(Ticket.created_at.asc()).limit(200)
-        #   .where(
-        #        Ticket.status == 'completed',
-        #        Ticket.category_id == ticket.category_id,
-        #         func.date(Ticket.created_at) == today
-        #        )
-        #   )
-        
-
-        # completed_tickets = completed_tickets_res.scalars().all()
-
-        average_duration = 0
-        # if completed_tickets:
-        #     durations = [
-        #         (ticket.end_time - ticket.start_time).total_seconds() / 60
-        #         for ticket in completed_tickets
-        #     ]
-        #     average_duration = sum(durations) / len(durations)
-   
-
-        # await manager.broadcast({
-        #     "action": "average_duration",
-        #     "category_id": worker.category_id,
-        #     "data": {"average_duration": average_duration}
-        # })
-
-    if current_ticket:
-        await manager.broadcast({
-            "action": "complete_ticket",  # Отправляем информацию о завершенном билете
-            "category_id": worker.category_id,
-            "data": TicketOut.from_orm(current_ticket).dict()
-        })
+    # Завершаем текущий билет и забираем следующий в одной транзакции
+    current_ticket, next_ticket, category_name = await dispatch_next_ticket(db, worker, "completed")
 
-    next_ticket = await db.execute(
-        select(Ticket).where(Ticket.category_id == worker.category_id,
-                             Ticket.status == "wait", Ticket.worker_id == None)
-        .order_by(Ticket.created_at.asc())  # Ищем следующий билет в очереди
-    )
-    next_ticket = next_ticket.scalars().first()
     if next_ticket is None:
+        if current_ticket:
+            await manager.broadcast({
+                "action": "complete_ticket",  # Отправляем информацию о завершенном билете
+                "category_id": worker.category_id,
+                "data": TicketOut.from_orm(current_ticket).dict()
+            })
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="No available tickets")  # Если доступных билетов нет, возвращаем ошибку
     if next_ticket.telegram_id:
@@ -203,29 +159,21 @@ async def get_next_ticket(request: Request,
             await dp.bot.send_message(next_ticket.telegram_id, message)
         except Exception as e:
             print(f"Error: {e}")
-    next_ticket.status = "invited"
-    next_ticket.worker_id = worker.id
-
-    next_ticket.start_time = now
-    db.add(next_ticket)
-    await db.commit()
-    await db.refresh(next_ticket)
-    category = await db.execute(select(Category).where(Category.id == next_ticket.category_id))
-    category = category.scalars().first()
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Category not found") 
 
     await manager.broadcast({
         "action": "next_ticket", 
         "category_id": worker.category_id,
-        "data": {"ticket": TicketOut.from_orm(next_ticket).dict(), "window": worker.window}
+        "data": {
+            "ticket": TicketOut.from_orm(next_ticket).dict(),
+            "window": worker.window,
+            "previous": TicketOut.from_orm(current_ticket).dict() if current_ticket else None
+        }
     })
     return CurrentTicketWorker(  # Возвращаем информацию о следующем билете
         ticket_data=TicketOut.from_orm(next_ticket),
         ticket_id=next_ticket.id,
         ticket_number=int(next_ticket.number),
-        category_name=category.name,
+        category_name=category_name,
         ticket_created_time=next_ticket.created_at.strftime("%d.%m.%Y %H:%M"),
         ticket_language=next_ticket.language,
         ticket_full_name=next_ticket.full_name,
@@ -235,11 +183,19 @@ async def get_next_ticket(request: Request,
 
 @router.get("/{category_id}/average_rating", response_model=float)
 async def get_average_rating(category_id: int, db: AsyncSession = Depends(get_async_session)):
-    query = select(func.avg(Ticket.rate).label("average_rating")).filter(Ticket.category_id == category_id)
-    result = await db.execute(query)
-    average_rating = result.fetchone()
-    
-    if average_rating is None or average_rating[0] is None:
+    rating = await get_rating(db, "category", category_id)
+
+    if rating is None:
+        raise HTTPException(status_code=404, detail="Category not found or no ratings available")
+
+    return rating["average"]
+
+
+@router.get("/{category_id}/rating")
+async def get_rating_summary(category_id: int, db: AsyncSession = Depends(get_async_session)):
+    rating = await get_rating(db, "category", category_id)
+
+    if rating is None:
         raise HTTPException(status_code=404, detail="Category not found or no ratings available")
 
-    return round(average_rating[0], 1)
+    return rating
@@ -1,4 +1,7 @@
 from src.routes.ticket.models import Ticket
+from src.routes.ticket.queue import queue_index
+from src.routes.statistics.stats import TicketState, record_changes
+from src.routes.statistics.cache import statistics_cache
 from src.database import get_async_session
 from src.routes.global_counter.models import Counter
 from src.routes.global_counter.schemas import CounterOut
@@ -6,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from sqlalchemy.future import select
 from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
 
 
 # Function to get the current counter
@@ -15,33 +19,40 @@ async def get_current_counter(db: AsyncSession = Depends(get_async_session)):
     return counter.current_counter if counter else None
 
 # Function to increment the counter
-async def increment_counter(db: AsyncSession = Depends(get_async_session)):
-    result = await db.execute(select(Counter))  # Await the query execution
-    counter: Counter = result.scalars().first()
-
-    if not counter:
-        counter = Counter(id=1)
-        db.add(counter)
-
-    counter.current_counter += 1
-    await db.commit()
-    
-    return counter.current_counter
+async def increment_counter(db: AsyncSession = Depends(get_async_session), step: int = 1):
+    # Atomic upsert: the counter row stays locked only until the caller commits,
+    # so the number is allocated in the same transaction as the ticket insert
+    result = await db.execute(
+        insert(Counter)
+        .values(id=1, current_counter=step)
+        .on_conflict_do_update(
+            index_elements=[Counter.id],
+            set_={"current_counter": Counter.current_counter + step}
+        )
+        .returning(Counter.current_counter)
+    )
+    return result.scalar_one()
+
+# Function to reset the counter, committed by the caller
+async def reset_counter(db: AsyncSession = Depends(get_async_session)):
+    await db.execute(
+        insert(Counter)
+        .values(id=1, current_counter=0)
+        .on_conflict_do_update(index_elements=[Counter.id], set_={"current_counter": 0})
+    )
 
 async def nullify_counter(db: AsyncSession = Depends(get_async_session)):
-    delete_query = delete(Ticket).where(Ticket.status == 'wait')
-    await db.execute(delete_query)
-    
-    await db.commit()
-    
-    result = await db.execute(select(Counter))
-    counter: Counter = result.scalars().first()
-
-    if not counter:
-        counter = Counter(id=1)
-        db.add(counter)
+    delete_query = delete(Ticket).where(Ticket.status == 'wait').returning(
+        Ticket.created_day, Ticket.category_id, Ticket.worker_id, Ticket.status)
+    deleted = await db.execute(delete_query)
+    await record_changes(db, [
+        (TicketState(row.created_day, row.category_id, row.worker_id or 0, row.status), None)
+        for row in deleted.all()
+    ])
+    await reset_counter(db)
 
-    counter.current_counter = 0
     await db.commit()
+    queue_index.clear_waiting()
+    statistics_cache.invalidate()
     
     return True
\ No newline at end of file
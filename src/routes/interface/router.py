@@ -1,48 +1,66 @@
-from datetime import datetime
-from datetime import date, datetime, timedelta
-from typing import List
+from datetime import date, datetime, time, timedelta
+from typing import Optional
 
 from aiosmtplib import status
-from fastapi import APIRouter, Depends, HTTPException, Request, logger
-import pytz
-from sqlalchemy import Date, cast, select, func, desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, logger
+from sqlalchemy import Date, and_, cast, or_, select, func, true
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import get_async_session
 from src.routes.auth import auth
 
-from src.routes.auth.models import User
 from src.routes.ticket.models import Ticket
+from src.routes.ticket.queue import queue_index
+from src.routes.ticket.estimator import service_time_estimator
 from src.routes.category.models import Category
+from src.routes.category.directory import category_directory
+from src.routes.statistics.models import TicketDailyStats, TicketTotals
+from src.routes.statistics.stats import ACCEPTED_STATUSES, count_where
+from src.routes.statistics.cache import statistics_cache
+from src.routes.statistics.analytics import get_analytics
+from src.routes.statistics.report import worker_report
+from src.routes.statistics.ratings import get_rating
+from src.utils.time_window import Window, time_windows
+from src.utils.pagination import DEFAULT_PAGE_SIZE, paginate_tickets
+from src.routes.ticket.serialization import select_ticket_rows, ticket_page_response
+from src.routes.websocket.router import manager
 
 from src.routes.auth.schemas import UserOut
-from src.routes.ticket.schemas import TicketFilter, TicketOut
+from src.routes.ticket.schemas import TicketFilter, TicketOut, TicketPage
 from src.routes.category.schemas import CategoryOutput, CategoryWithQueue
 from src.schemas import ResponseTicket, Dashboard, CurrentTicketWorker, General_data, Personal_data, AdminDashboard, \
-    CategoryResponse, AdminRequest, StatisticResponse, Statistic
+    CategoryResponse, AdminRequest, StatisticResponse, Statistic, WorkerReport
 
 router = APIRouter(
     prefix="/interface",
     tags=["interface"],
 )
 
+DATE_FILTERS = {
+    "1_day": timedelta(days=1),
+    "1_week": timedelta(weeks=1),
+    "1_month": timedelta(days=30),
+}
+
+
+def date_filter_window(date_filter: Optional[str]) -> Window:
+    if not date_filter:
+        raise HTTPException(status_code=400, detail="Date filter must be provided")
+    if date_filter not in DATE_FILTERS:
+        raise HTTPException(status_code=400, detail="Invalid date filter")
+    return time_windows.trailing(DATE_FILTERS[date_filter])
+
 
 @router.get("/client/categories", response_model=list[CategoryWithQueue])
 async def get_client_categories(db: AsyncSession = Depends(get_async_session)) -> list[CategoryOutput]:
-    stmt = await db.execute(select(Category).order_by(Category.name))
-    categories = stmt.scalars().all()
+    categories = await category_directory.categories(db)
 
     response: list[CategoryOutput] = []
 
-    for category in categories:
-        stmt = await db.execute(
-            select(Ticket).where(Ticket.category_id ==
-                                 category.id, Ticket.status == 'wait')
-        )
-        tickets = stmt.scalars().all()
-        queue = len(tickets)
+    for category in sorted(categories, key=lambda category: category.name):
         response.append(CategoryWithQueue(
-            id=category.id, name=category.name, queue=queue))
+            id=category.id, name=category.name, queue=queue_index.length(category.id)))
 
     return response
 
@@ -57,47 +75,21 @@ async def get_client_ticket(
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
-    queue_stmt = await db.execute(
-        select(Ticket).where(
-            Ticket.category_id == ticket.category_id,
-            Ticket.status == "wait",
-            Ticket.id < ticket.id  # Replace with created_at comparison
-        ).order_by(Ticket.created_at.asc())  # Order by created_at
+    front_queue = queue_index.position(ticket.category_id, ticket.created_at, ticket.id)
+    current_ticket_number = queue_index.now_serving(ticket.category_id)
+
+    # Minutes, from the rolling per-category service time estimate
+    average_duration = service_time_estimator.mean(ticket.category_id)
+    if average_duration is not None:
+        average_duration = round(average_duration / 60, 1)
+    estimated_wait = service_time_estimator.eta(
+        ticket.category_id, front_queue, queue_index.serving_count(ticket.category_id))
+    if estimated_wait is not None:
+        estimated_wait = round(estimated_wait / 60, 1)
+    median_duration, p90_duration = (
+        None if seconds is None else round(seconds / 60, 1)
+        for seconds in service_time_estimator.percentiles(ticket.category_id)
     )
-    front_queue = len(queue_stmt.scalars().all())
-
-
-    current_ticket_stmt = await db.execute(
-        select(Ticket).where(
-            Ticket.category_id == ticket.category_id,
-            Ticket.status.in_(["invited"])
-        ).order_by(Ticket.created_at)
-    )
-    current_ticket1 = current_ticket_stmt.scalars().first()
-    tz = pytz.timezone('Asia/Almaty')
-    now = datetime.now(tz).time()
-    today = datetime.now(tz).date()
-
-    # completed_tickets_res = await db.execute(
-        #   select(Ticket).order_by(Ticket.created_at.asc()).limit(200)
-        #   .where(
-            #    Ticket.status == 'completed',
-            #    Ticket.category_id == ticket.category_id,
-                # func.date(Ticket.created_at) == today
-            #    )
-        #   )
-    
-
-
-    # completed_tickets = completed_tickets_res.scalars().all()
-    # average_duration = 0
-    # if completed_tickets:
-    #     durations = [
-    #         (ticket.end_time - ticket.start_time).total_seconds() / 60
-    #         for ticket in completed_tickets
-    #     ]
-    #     average_duration = sum(durations) / len(durations)
-   
 
     ticket_created_time = ticket.created_at.strftime("%d.%m.%Y %H:%M:%S")
 
@@ -105,19 +97,25 @@ async def get_client_ticket(
         "ticket_id": ticket.id,
         "ticket_number": ticket.number,
         "front_queue": front_queue,
-        "current_ticket": current_ticket1.number if current_ticket1 else None,
+        "current_ticket": current_ticket_number,
         "ticket_created_time": ticket_created_time,
         "category_id": ticket.category_id,
-        "average_duration": 0
+        "average_duration": average_duration,
+        "estimated_wait": estimated_wait,
+        "median_duration": median_duration,
+        "p90_duration": p90_duration
     })
     response = ResponseTicket(
         ticket_id=ticket.id,
         ticket_number=ticket.number,
         front_queue=front_queue,
-        current_ticket=current_ticket1.number if current_ticket1 else None,
+        current_ticket=current_ticket_number,
         ticket_created_time=ticket_created_time,
         category_id=ticket.category_id,
-        average_duration=0
+        average_duration=average_duration,
+        estimated_wait=estimated_wait,
+        median_duration=median_duration,
+        p90_duration=p90_duration
     )
 
     return response
@@ -138,97 +136,54 @@ async def get_dashboard(
 
     worker: UserOut = await auth.get_current_user(db, worker_token)
 
-    category_stmt = await db.execute(select(Category).where(Category.id == worker.category_id))
-    category = category_stmt.scalars().first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
-    tz = pytz.timezone('Asia/Almaty')
-    today = datetime.now(tz).date()
+    today = time_windows.today()
 
     print(
-        f"Worker ID: {worker.id}, Category ID: {worker.category_id}, Today's Date: {today}")
+        f"Worker ID: {worker.id}, Category ID: {worker.category_id}, Today's Date: {today.first_day}")
 
-    accepted_today_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.worker_id == worker.id,
-            Ticket.status.in_(["invited", "completed", "skipped"]),
-            func.date(Ticket.created_at) == today
-        )
-    )
-    accepted_today = accepted_today_result.scalar()
-    print(f"Accepted Today: {accepted_today}")
-
-    skipped_today_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.worker_id == worker.id,
-            Ticket.status == "skipped",
-            func.date(Ticket.created_at) == today
+    # All counters, the category and the current ticket in one round trip
+    personal = TicketDailyStats.worker_id == worker.id
+    general = TicketDailyStats.category_id == worker.category_id
+    accepted = TicketDailyStats.status.in_(ACCEPTED_STATUSES)
+    counters = (
+        select(
+            count_where(personal, accepted).label("accepted_today"),
+            count_where(personal, TicketDailyStats.status == "skipped").label("skipped_today"),
+            count_where(personal, TicketDailyStats.status == "completed").label("served_today"),
+            count_where(general, accepted).label("accepted_today_general"),
+            count_where(general, TicketDailyStats.status == "completed").label("served_today_general"),
         )
+        .where(*today.days(TicketDailyStats.day), or_(personal, general))
+        .subquery()
     )
-    skipped_today = skipped_today_result.scalar()
-    print(f"Skipped Today: {skipped_today}")
-
-    served_today_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.worker_id == worker.id,
-            Ticket.status == "completed",
-            func.date(Ticket.created_at) == today
-        )
+    current = aliased(Ticket)
+    dashboard_stmt = await db.execute(
+        select(Category.name, counters, current)
+        .select_from(Category)
+        .join(counters, true())
+        .outerjoin(current, and_(current.worker_id == worker.id, current.status == "invited"))
+        .where(Category.id == worker.category_id)
+        .limit(1)
     )
-    served_today = served_today_result.scalar()
-    print(f"Served Today: {served_today}")
+    row = dashboard_stmt.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Category not found")
 
     personal_data = Personal_data(
         user=worker,
-        accepted_today=accepted_today,
-        skipped_today=skipped_today,
-        served_today=served_today
+        accepted_today=row.accepted_today,
+        skipped_today=row.skipped_today,
+        served_today=row.served_today
     )
 
-    # General Data
-    clients_in_queue_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.category_id == worker.category_id,
-            Ticket.status == "wait"
-        )
-    )
-    clients_in_queue = clients_in_queue_result.scalar()
-    print(f"Clients in Queue: {clients_in_queue}")
-
-    accepted_today_general_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.category_id == worker.category_id,
-            Ticket.status.in_(["invited", "completed", "skipped"]),
-            func.date(Ticket.created_at) == today
-        )
-    )
-    accepted_today_general = accepted_today_general_result.scalar()
-    print(f"Accepted Today General: {accepted_today_general}")
-
-    served_today_general_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.category_id == worker.category_id,
-            Ticket.status == "completed",
-            func.date(Ticket.created_at) == today
-        )
-    )
-    served_today_general = served_today_general_result.scalar()
-    print(f"Served Today General: {served_today_general}")
-
     general_data = General_data(
-        clients_in_queue=clients_in_queue,
-        accepted_today=accepted_today_general,
-        served_today=served_today_general
+        clients_in_queue=queue_index.length(worker.category_id),
+        accepted_today=row.accepted_today_general,
+        served_today=row.served_today_general
     )
 
-    current_ticket_stmt = await db.execute(
-        select(Ticket).where(
-            Ticket.worker_id == worker.id,
-            Ticket.status == "invited"
-        )
-    )
-    current_ticket: TicketOut = current_ticket_stmt.scalars().first()
+    category_name = row.name
+    current_ticket = row[-1]
 
     current_ticket_worker = None
     if current_ticket:
@@ -236,7 +191,7 @@ async def get_dashboard(
             ticket_data=TicketOut.from_orm(current_ticket),
             ticket_id=current_ticket.id,
             ticket_number=current_ticket.number,
-            category_name=category.name,
+            category_name=category_name,
             ticket_created_time=current_ticket.created_at.strftime(
                 "%d.%m.%Y %H:%M"),
             ticket_language=current_ticket.language,
@@ -245,7 +200,7 @@ async def get_dashboard(
         )
 
     dashboard = Dashboard(
-        category_name=category.name,
+        category_name=category_name,
         personal_data=personal_data,
         general_data=general_data,
         current_ticket=current_ticket_worker
@@ -260,8 +215,7 @@ async def get_interface_admin(
         db: AsyncSession = Depends(get_async_session)
 ) -> AdminDashboard:
 
-    tz = pytz.timezone('Asia/Almaty')
-    today = datetime.now(tz).date()
+    today = time_windows.today()
     try:
         user = await auth.get_current_user(db, request.token)
 
@@ -271,49 +225,12 @@ async def get_interface_admin(
 
         user_out = UserOut.from_orm(user)
 
-        clients_in_queue_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                Ticket.status == "wait",
-                func.date(Ticket.created_at) == today
-            )
-        )
-        clients_in_queue = clients_in_queue_result.scalar()
-
-        accepted_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                Ticket.status.in_(["invited", "completed", "skipped"]),
-                func.date(Ticket.created_at) == today
-            )
-        )
-        accepted_today = accepted_result.scalar()
-
-        served_today_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                Ticket.status.in_(["completed"]),
-                func.date(Ticket.created_at) == today
-            )
-        )
-        served_today = served_today_result.scalar()
-
-        general_data = General_data(
-            clients_in_queue=clients_in_queue,
-            accepted_today=accepted_today,
-            served_today=served_today
-        )
+        general_data = await statistics_cache.get_or_compute(
+            "admin_general_data", lambda: build_admin_general_data(db, today))
 
-        categories_result = await db.execute(select(Category))
-        categories = categories_result.scalars().all()
+        category_responses = list(await category_directory.categories(db))
 
-        category_responses = []
-        for category in categories:
-            users_result = await db.execute(select(User).where(User.category_id == category.id))
-            users = users_result.scalars().all()
-            user_out_list = [UserOut.from_orm(user) for user in users]
-            category_responses.append(CategoryResponse(
-                id=category.id, name=category.name, users=user_out_list))
-
-        invalied_users_result = await db.execute(select(User).where(User.category_id == None, User.is_admin == False))
-        invalied_users = invalied_users_result.scalars().all()
+        invalied_users = await category_directory.unassigned(db)
         category_responses.append(CategoryResponse(
             id=0, name='invalied users', users=invalied_users))
         admin_dashboard = AdminDashboard(
@@ -328,9 +245,28 @@ async def get_interface_admin(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def build_admin_general_data(db: AsyncSession, today) -> General_data:
+    counters_result = await db.execute(
+        select(
+            count_where(TicketDailyStats.status == "wait").label("clients_in_queue"),
+            count_where(TicketDailyStats.status.in_(ACCEPTED_STATUSES)).label("accepted_today"),
+            count_where(TicketDailyStats.status == "completed").label("served_today"),
+        ).where(*today.days(TicketDailyStats.day))
+    )
+    clients_in_queue, accepted_today, served_today = counters_result.one()
+
+    return General_data(
+        clients_in_queue=clients_in_queue,
+        accepted_today=accepted_today,
+        served_today=served_today
+    )
+
+
 @router.get('/admin/user_information/{user_id}')
 async def get_user_information(
         user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
         db: AsyncSession = Depends(get_async_session)
 ):
     user = await auth.get_user_by_id(db, user_id)
@@ -338,11 +274,8 @@ async def get_user_information(
         raise HTTPException(
             status_code=404, detail="Invalid id or user not found")
 
-    query = select(Ticket).where(Ticket.worker_id ==
-                                 user_id).order_by(desc(Ticket.created_at))
-
-    result = await db.execute(query)
-    tickets = result.scalars().all()
+    query = select_ticket_rows().where(Ticket.worker_id == user_id)
+    tickets, next_cursor = await paginate_tickets(db, query, cursor, limit)
 
     formatted_tickets = []
     for ticket in tickets:
@@ -359,119 +292,104 @@ async def get_user_information(
         }
         formatted_tickets.append(formatted_ticket)
 
-    one_month_ago = date.today() - timedelta(days=30)
-
-    accepted_last_month_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.worker_id == user.id,
-            Ticket.status.in_(["invited", "completed", "skipped"]),
-            func.date(Ticket.created_at) >= one_month_ago
-        )
-    )
-    accepted_last_month = accepted_last_month_result.scalar()
-
-    skipped_last_month_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.worker_id == user.id,
-            Ticket.status == "skipped",
-            func.date(Ticket.created_at) >= one_month_ago
-        )
-    )
-    skipped_last_month = skipped_last_month_result.scalar()
+    last_month = time_windows.last_days(30)
 
-    served_last_month_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.worker_id == user.id,
-            Ticket.status == "completed",
-            func.date(Ticket.created_at) >= one_month_ago
+    last_month_result = await db.execute(
+        select(
+            count_where(TicketDailyStats.status.in_(ACCEPTED_STATUSES)).label("accepted"),
+            count_where(TicketDailyStats.status == "skipped").label("skipped"),
+            count_where(TicketDailyStats.status == "completed").label("served"),
+        ).where(
+            TicketDailyStats.worker_id == user.id,
+            *last_month.days(TicketDailyStats.day)
         )
     )
-    served_last_month = served_last_month_result.scalar()
+    accepted_last_month, skipped_last_month, served_last_month = last_month_result.one()
 
 
-    avwrage_result = await db.execute(select(func.avg(Ticket.rate).label("average_rate")).where(
-        Ticket.worker_id == user_id,
-        Ticket.status == "completed",
-        Ticket.rate != None
-    ))
-    average_rate = avwrage_result.scalar()
+    rating = await get_rating(db, "worker", user_id)
+    av_rate = rating["average"] if rating else 0.0
 
-    av_rate = round(average_rate, 1) if average_rate is not None else 0.0
-    
     return {
         "accepted_last_month": accepted_last_month,
         "skipped_last_month": skipped_last_month,
         "average_rate": av_rate,
+        "rating_histogram": rating["histogram"] if rating else {},
         "served_last_month": served_last_month,
         "tickets": formatted_tickets,
+        "next_cursor": next_cursor,
     }
 
 
 @router.get('/admin/statistics', response_model=StatisticResponse)
 async def get_interface_statistics(db: AsyncSession = Depends(get_async_session)) -> StatisticResponse:
-    tz = pytz.timezone('Asia/Almaty')
-    today = datetime.now(tz).date()
+    return await statistics_cache.get_or_compute("interface_statistics", lambda: build_statistics(db))
 
-    general_query = await db.execute(
-        select(
-            Ticket.status,
-            func.count(Ticket.id).label("count")
-        ).where(
-            func.date(Ticket.created_at) == today
-        ).group_by(Ticket.status)
-    )
-    general_results = general_query.fetchall()
 
-    stats_mapping = {row.status: row.count for row in general_results}
-    accepted_today = sum(
-        stats_mapping.get(status, 0) for status in ["invited", "completed", "skipped"]
-    )
-    cancelled_today = stats_mapping.get("cancelled", 0)
-    passed_today = stats_mapping.get("skipped", 0)
-    serviced_today = stats_mapping.get("completed", 0)
+@router.get('/admin/analytics')
+async def get_admin_analytics(days: int = Query(90, ge=1, le=366), db: AsyncSession = Depends(get_async_session)):
+    return await get_analytics(db, days)
 
-    all_time_query = await db.execute(
-        select(
-            Ticket.status,
-            func.count(Ticket.id).label("count")
-        ).group_by(Ticket.status)
-    )
-    all_time_results = all_time_query.fetchall()
 
-    all_time_mapping = {row.status: row.count for row in all_time_results}
-    serviced_all_time = all_time_mapping.get("completed", 0)
-    accepted_all_time = sum(
-        all_time_mapping.get(status, 0) for status in ["invited", "completed", "skipped"]
-    )
+@router.get('/admin/statistics/cache')
+async def get_statistics_cache_stats():
+    return statistics_cache.stats()
+
+
+@router.get('/admin/websocket')
+async def get_websocket_stats():
+    """Fan-out counters of this worker process: slow clients, dropped messages, evictions."""
+    return manager.stats()
+
 
-    category_query = await db.execute(
+async def build_statistics(db: AsyncSession) -> StatisticResponse:
+    today = time_windows.today()
+
+    # Today's counts from the daily rollup, all-time counts from ticket_totals
+    today_query = await db.execute(
         select(
-            Category.id,
-            Category.name,
-            Ticket.status,
-            func.count(Ticket.id).label("count")
-        ).join(Ticket, Ticket.category_id == Category.id).where(
-            func.date(Ticket.created_at) == today
-        ).group_by(Category.id, Ticket.status)
+            TicketDailyStats.category_id,
+            TicketDailyStats.status,
+            func.sum(TicketDailyStats.count).label("count")
+        ).where(*today.days(TicketDailyStats.day))
+        .group_by(TicketDailyStats.category_id, TicketDailyStats.status)
     )
-    category_results = category_query.fetchall()
+    totals_query = await db.execute(select(TicketTotals.category_id, TicketTotals.status, TicketTotals.count))
+    category_names_query = await db.execute(select(Category.id, Category.name))
+    category_names = dict(category_names_query.all())
 
+    today_mapping = {}
+    all_time_mapping = {}
     categories = {}
-    for row in category_results:
-        category = categories.setdefault(row.id, {"name": row.name, "stats": {}})
-        category["stats"][row.status] = row.count
+    for period, mapping, rows in (("today", today_mapping, today_query.all()),
+                                  ("all_time", all_time_mapping, totals_query.all())):
+        for row in rows:
+            mapping[row.status] = mapping.get(row.status, 0) + row.count
+            if row.category_id in category_names:
+                category = categories.setdefault(row.category_id, {"today": {}, "all_time": {}})
+                category[period][row.status] = row.count
+
+    accepted_today = sum(today_mapping.get(status, 0) for status in ACCEPTED_STATUSES)
+    cancelled_today = today_mapping.get("cancelled", 0)
+    passed_today = today_mapping.get("skipped", 0)
+    serviced_today = today_mapping.get("completed", 0)
+    serviced_all_time = all_time_mapping.get("completed", 0)
+    accepted_all_time = sum(all_time_mapping.get(status, 0) for status in ACCEPTED_STATUSES)
 
     category_stats = []
     for category_id, data in categories.items():
-        stats = data["stats"]
+        stats = data["today"]
+        if not any(stats.values()):
+            continue
+        all_time = data["all_time"]
         category_stat = Statistic(
-            category_name=data["name"],
-            accepted_today=sum(stats.get(status, 0) for status in ["invited", "completed", "skipped"]),
+            category_name=category_names[category_id],
+            accepted_today=sum(stats.get(status, 0) for status in ACCEPTED_STATUSES),
             cancelled_today=stats.get("cancelled", 0),
             passed_today=stats.get("skipped", 0),
             serviced_today=stats.get("completed", 0),
-            serviced_all_time=0,
-            accepted_all_time=0
+            serviced_all_time=all_time.get("completed", 0),
+            accepted_all_time=sum(all_time.get(status, 0) for status in ACCEPTED_STATUSES)
         )
         category_stats.append(category_stat)
 
@@ -488,45 +406,49 @@ async def get_interface_statistics(db: AsyncSession = Depends(get_async_session)
     response = StatisticResponse(
         general_data=general_stat,
         categories=category_stats,
-        today=str(today)
+        today=str(today.first_day)
     )
 
     return response
 
 
 
-@router.get('/admin/statistics/{worker_id}/{date_filter}/', response_model=List[TicketOut])
+@router.get('/admin/report/{worker_id}', response_model=WorkerReport)
+async def get_worker_report(
+    worker_id: int,
+    date_filter: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_session)
+) -> WorkerReport:
+    """Aggregated worker figures; the raw tickets are paged by get_worker_statistics."""
+    if date_from or date_to:
+        if not (date_from and date_to) or date_from > date_to:
+            raise HTTPException(status_code=400, detail="Both date_from and date_to must be provided, in order")
+        window = Window(datetime.combine(date_from, time.min), datetime.combine(date_to + timedelta(days=1), time.min))
+    else:
+        window = date_filter_window(date_filter)
+
+    return await worker_report(db, worker_id, window)
+
+
+@router.get('/admin/statistics/{worker_id}/{date_filter}/', response_model=TicketPage)
 async def get_worker_statistics(
     worker_id: int,
     date_filter: str,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
     db: AsyncSession = Depends(get_async_session)
 ):
-    tz = pytz.timezone('Asia/Almaty')
-    now = datetime.now(tz)
-    
-    if not date_filter:
-        raise HTTPException(status_code=400, detail="Date filter must be provided")
+    window = date_filter_window(date_filter)
 
-    if date_filter == "1_day":
-        date_threshold = now - timedelta(days=1)
-    elif date_filter == "1_week":
-        date_threshold = now - timedelta(weeks=1)
-    elif date_filter == "1_month":
-        date_threshold = now - timedelta(days=30)
-    else:
-        raise HTTPException(status_code=400, detail="Invalid date filter")
-
-    date_threshold = date_threshold.replace(tzinfo=None)
-
-    query = select(Ticket).where(
-        Ticket.created_at >= date_threshold,
+    query = select_ticket_rows().where(
+        *window.where(Ticket.created_at, Ticket.created_day),
         Ticket.worker_id == worker_id
     )
+    tickets, next_cursor = await paginate_tickets(db, query, cursor, limit)
 
-    result = await db.execute(query)
-    tickets = result.scalars().all()
-
-    if not tickets:
+    if not tickets and cursor is None:
         raise HTTPException(status_code=404, detail="No tickets found for the given worker and date filter")
 
-    return tickets
\ No newline at end of file
+    return ticket_page_response(tickets, next_cursor)
\ No newline at end of file
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import timedelta
+
+import numpy as np
+from sqlalchemy import case, cast, extract, func, literal_column
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.routes.ticket.models import Ticket
+from src.utils.cache import ResponseCache
+from src.utils.time_window import Window, time_windows
+
+STATUSES = ["wait", "invited", "completed", "skipped", "cancelled"]
+PERCENTILES = [50, 90, 95]
+WEEKDAYS = 7
+HOURS = 24
+
+# Snapshot columns, all numeric so the result set becomes one float matrix
+CREATED, STARTED, ENDED, CATEGORY, WORKER, STATUS = range(6)
+COLUMNS = 6
+
+# A binary COPY row of the snapshot: the field count, then the length and the
+# big-endian float8 of every column. NULLs are sent as NaN, so rows never vary in size.
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_HEADER = 19
+COPY_TRAILER = 2
+COPY_ROW = np.dtype([("fields", ">i2")] + [
+    field for column in range(COLUMNS) for field in ((f"length{column}", ">i4"), (f"value{column}", ">f8"))
+])
+
+# Whole past days only, so a result stays valid until the day rolls over
+analytics_cache = ResponseCache(ttl=24 * 60 * 60)
+
+
+def float8(column):
+    return func.coalesce(cast(column, postgresql.DOUBLE_PRECISION),
+                         cast(literal_column("'NaN'"), postgresql.DOUBLE_PRECISION))
+
+
+def snapshot_query(window: Window) -> str:
+    stmt = select(
+        float8(extract("epoch", Ticket.created_at)),
+        float8(extract("epoch", Ticket.start_time)),
+        float8(extract("epoch", Ticket.end_time)),
+        float8(Ticket.category_id),
+        float8(func.coalesce(Ticket.worker_id, 0)),
+        float8(case({status: index for index, status in enumerate(STATUSES)}, value=Ticket.status, else_=-1)),
+    ).where(*window.where(Ticket.created_at, Ticket.created_day))
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def parse_snapshot(data: bytes) -> np.ndarray:
+    """The ``(n, 6)`` float array of a binary COPY of ``snapshot_query``."""
+    if not data.startswith(COPY_SIGNATURE):
+        raise ValueError("not a binary COPY")
+    rows = np.frombuffer(data, dtype=COPY_ROW, offset=COPY_HEADER,
+                         count=(len(data) - COPY_HEADER - COPY_TRAILER) // COPY_ROW.itemsize)
+    # Filled column by column and transposed, so every snapshot[:, column] is contiguous
+    columns = np.empty((COLUMNS, rows.size))
+    for column in range(COLUMNS):
+        columns[column] = rows[f"value{column}"]
+    return columns.T
+
+
+async def load_snapshot(db: AsyncSession, window: Window) -> bytes:
+    """Binary COPY of the tickets created in ``window``, parsed by ``parse_snapshot``.
+
+    Timestamps are epoch seconds of the naive local time (NaN when missing) and
+    the status is its index in ``STATUSES``. Casting in SQL and copying through
+    the session's asyncpg connection skips building a Python row per ticket.
+    """
+    connection = await (await db.connection()).get_raw_connection()
+    chunks = []
+
+    # A coroutine, not a file: asyncpg writes file outputs through the executor
+    async def receive(chunk: bytes):
+        chunks.append(chunk)
+
+    await connection.driver_connection.copy_from_query(snapshot_query(window), output=receive, format="binary")
+    return b"".join(chunks)
+
+
+def grouped_percentiles(values: np.ndarray, groups: list[np.ndarray], sizes: list[int]) -> list[np.ndarray]:
+    """``PERCENTILES`` of ``values`` (NaN ignored) for every group id of each grouping.
+
+    The values are sorted once; each grouping is then a stable radix sort of
+    small integer group ids, and the percentiles of all groups are read with
+    numpy's linear interpolation in one vectorized step. Returns one
+    ``(size, len(PERCENTILES))`` array per grouping, NaN for empty groups.
+    """
+    valid = ~np.isnan(values)
+    order = np.argsort(values[valid])
+    sorted_values = values[valid][order]
+    results = []
+    for group, size in zip(groups, sizes):
+        group = group[valid][order].astype(np.min_scalar_type(size))
+        by_group = np.argsort(group, kind="stable")
+        grouped_values = sorted_values[by_group]
+        counts = np.bincount(group, minlength=size)
+        starts = np.cumsum(counts) - counts
+        position = (np.maximum(counts, 1) - 1)[:, None] * (np.array(PERCENTILES) / 100)[None, :]
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        if grouped_values.size:
+            last = grouped_values.size - 1
+            low_values = grouped_values[np.minimum(starts[:, None] + low, last)]
+            high_values = grouped_values[np.minimum(starts[:, None] + high, last)]
+            result = low_values + (high_values - low_values) * (position - low)
+        else:
+            result = np.zeros(position.shape)
+        result[counts == 0] = np.nan
+        results.append(result)
+    return results
+
+
+def _percentiles(row: np.ndarray) -> dict:
+    return {f"p{p}": None if np.isnan(v) else round(float(v), 1) for p, v in zip(PERCENTILES, row)}
+
+
+def compute_analytics(snapshot: np.ndarray) -> list[dict]:
+    """Arrival histograms and wait/service time percentiles per category and weekday."""
+    created = snapshot[:, CREATED]
+    category_ids = snapshot[:, CATEGORY].astype(np.int64)
+    categories = np.flatnonzero(np.bincount(category_ids)) if category_ids.size else np.array([], dtype=np.int64)
+    lookup = np.zeros(categories.max() + 1 if categories.size else 1, dtype=np.int64)
+    lookup[categories] = np.arange(categories.size)
+    category_index = lookup[category_ids]
+
+    days = np.floor(created / 86400).astype(np.int64)
+    # 1970-01-01 was a Thursday; weekday 0 is Monday
+    weekday = (days + 3) % WEEKDAYS
+    hour = ((created - days * 86400) // 3600).astype(np.int64)
+    group = category_index * WEEKDAYS + weekday
+    n_categories, n_groups = categories.size, categories.size * WEEKDAYS
+
+    arrivals = np.bincount(group * HOURS + hour, minlength=n_groups * HOURS).reshape(n_categories, WEEKDAYS, HOURS)
+    tickets = arrivals.sum(axis=2)
+
+    status = snapshot[:, STATUS].astype(np.int64)
+    known = status >= 0
+    status_counts = np.bincount(
+        category_index[known] * len(STATUSES) + status[known], minlength=n_categories * len(STATUSES)
+    ).reshape(n_categories, len(STATUSES))
+
+    wait = snapshot[:, STARTED] - created
+    service = np.where(status == STATUSES.index("completed"), snapshot[:, ENDED] - snapshot[:, STARTED], np.nan)
+    groupings = [category_index, group]
+    sizes = [n_categories, n_groups]
+    wait_by_category, wait_by_group = grouped_percentiles(wait, groupings, sizes)
+    service_by_category, service_by_group = grouped_percentiles(service, groupings, sizes)
+
+    response = []
+    for c, category_id in enumerate(categories):
+        by_weekday = []
+        for d in range(WEEKDAYS):
+            g = c * WEEKDAYS + d
+            by_weekday.append({
+                "weekday": d,
+                "tickets": int(tickets[c, d]),
+                "arrivals_by_hour": arrivals[c, d].tolist(),
+                "wait_seconds": _percentiles(wait_by_group[g]),
+                "service_seconds": _percentiles(service_by_group[g]),
+            })
+        response.append({
+            "category_id": int(category_id),
+            "tickets": int(tickets[c].sum()),
+            "status_counts": dict(zip(STATUSES, status_counts[c].tolist())),
+            "arrivals_by_hour": arrivals[c].sum(axis=0).tolist(),
+            "wait_seconds": _percentiles(wait_by_category[c]),
+            "service_seconds": _percentiles(service_by_category[c]),
+            "by_weekday": by_weekday,
+        })
+    return response
+
+
+def analyze(data: bytes) -> tuple[int, list[dict]]:
+    snapshot = parse_snapshot(data)
+    return int(snapshot.shape[0]), compute_analytics(snapshot)
+
+
+async def build_analytics(db: AsyncSession, days: int) -> dict:
+    today = time_windows.today()
+    window = Window(today.start - timedelta(days=days), today.start)
+    data = await load_snapshot(db, window)
+    # A million-ticket snapshot takes a while to aggregate; keep it off the event loop
+    tickets, categories = await asyncio.to_thread(analyze, data)
+    return {
+        "from": str(window.first_day),
+        "to": str(today.first_day - timedelta(days=1)),
+        "tickets": tickets,
+        "categories": categories,
+    }
+
+
+async def get_analytics(db: AsyncSession, days: int) -> dict:
+    key = (time_windows.today().first_day, days)
+    return await analytics_cache.get_or_compute(key, lambda: build_analytics(db, days))
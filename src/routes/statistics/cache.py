@@ -0,0 +1,5 @@
+from src.config import STATISTICS_CACHE_TTL
+from src.utils.cache import ResponseCache
+
+# Admin statistics responses; invalidated after every committed ticket status change
+statistics_cache = ResponseCache(ttl=STATISTICS_CACHE_TTL)
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Date, Float
+from src.database import Base
+
+
+class TicketDailyStats(Base):
+    __tablename__ = "ticket_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    # 0 when the tickets are not assigned to a worker
+    worker_id = Column(Integer, primary_key=True, default=0)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total_service_seconds = Column(Float, nullable=False, default=0)
+
+
+class TicketTotals(Base):
+    """All-time ticket count per category and status, kept in step with ticket_daily_stats."""
+    __tablename__ = "ticket_totals"
+
+    category_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class RatingStats(Base):
+    """Running rating sum, count and 1-5 histogram of a worker or a category."""
+    __tablename__ = "rating_stats"
+
+    # "worker" or "category"
+    scope = Column(String, primary_key=True)
+    scope_id = Column(Integer, primary_key=True)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rate_1 = Column(Integer, nullable=False, default=0)
+    rate_2 = Column(Integer, nullable=False, default=0)
+    rate_3 = Column(Integer, nullable=False, default=0)
+    rate_4 = Column(Integer, nullable=False, default=0)
+    rate_5 = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.routes.statistics.models import RatingStats
+
+RATES = range(1, 6)
+COUNTERS = ["rating_sum", "rating_count"] + [f"rate_{rate}" for rate in RATES]
+
+
+async def record_rating(db: AsyncSession, category_id: int, worker_id: Optional[int],
+                        old_rate: Optional[int], new_rate: Optional[int]):
+    """Move one ticket's rating from ``old_rate`` to ``new_rate`` (either may be None).
+
+    Runs in the caller's transaction, next to the ticket update it describes.
+    """
+    if old_rate == new_rate:
+        return
+    delta = {counter: 0 for counter in COUNTERS}
+    for rate, sign in ((old_rate, -1), (new_rate, 1)):
+        if rate is None:
+            continue
+        delta["rating_sum"] += sign * rate
+        delta["rating_count"] += sign
+        delta[f"rate_{rate}"] += sign
+
+    scopes = [("category", category_id)]
+    if worker_id:
+        scopes.append(("worker", worker_id))
+    stmt = insert(RatingStats).values([
+        dict(delta, scope=scope, scope_id=scope_id) for scope, scope_id in scopes
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[RatingStats.scope, RatingStats.scope_id],
+        set_={counter: getattr(RatingStats, counter) + stmt.excluded[counter] for counter in COUNTERS}
+    ))
+
+
+async def get_rating(db: AsyncSession, scope: str, scope_id: int) -> Optional[dict]:
+    """Average and histogram of a worker or category, None when nothing is rated yet."""
+    result = await db.execute(
+        select(RatingStats).where(RatingStats.scope == scope, RatingStats.scope_id == scope_id)
+    )
+    stats = result.scalars().first()
+    if stats is None or stats.rating_count <= 0:
+        return None
+    return {
+        "average": round(stats.rating_sum / stats.rating_count, 1),
+        "count": stats.rating_count,
+        "histogram": {rate: getattr(stats, f"rate_{rate}") for rate in RATES},
+    }
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from sqlalchemy import extract, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.routes.ticket.models import Ticket
+from src.schemas import ReportDay, WorkerReport
+from src.utils.time_window import Window
+
+# grouping(created_day, status) bits: 2 when the day is rolled up, 1 when the status is
+BY_DAY_AND_STATUS, BY_DAY, BY_STATUS, OVERALL = range(4)
+
+
+def _round(value):
+    return round(float(value), 1) if value is not None else None
+
+
+async def worker_report(db: AsyncSession, worker_id: int, window: Window) -> WorkerReport:
+    """Per-status, per-day and overall figures for a worker in one GROUPING SETS query."""
+    service_seconds = extract("epoch", Ticket.end_time - Ticket.start_time)
+    completed = Ticket.status == "completed"
+    result = await db.execute(
+        select(
+            Ticket.created_day,
+            Ticket.status,
+            func.grouping(Ticket.created_day, Ticket.status).label("grouping"),
+            func.count().label("total"),
+            func.avg(service_seconds).filter(completed).label("average_service_seconds"),
+            func.percentile_cont(0.9).within_group(service_seconds).filter(completed).label("p90_service_seconds"),
+            func.avg(Ticket.rate).label("average_rate"),
+        )
+        .where(Ticket.worker_id == worker_id, *window.where(Ticket.created_at, Ticket.created_day))
+        .group_by(func.grouping_sets(
+            tuple_(Ticket.created_day, Ticket.status),
+            tuple_(Ticket.created_day),
+            tuple_(Ticket.status),
+            tuple_(),
+        ))
+    )
+
+    periods = {}
+    by_status = {}
+    for row in result.all():
+        if row.grouping == BY_DAY_AND_STATUS:
+            by_status.setdefault(row.created_day, {})[row.status] = row.total
+        elif row.grouping == BY_STATUS:
+            by_status.setdefault(None, {})[row.status] = row.total
+        else:
+            periods[row.created_day if row.grouping == BY_DAY else None] = row
+
+    def period(key) -> dict:
+        row = periods.get(key)
+        return dict(
+            total=row.total if row else 0,
+            by_status=by_status.get(key, {}),
+            average_service_seconds=_round(row.average_service_seconds) if row else None,
+            p90_service_seconds=_round(row.p90_service_seconds) if row else None,
+            average_rate=_round(row.average_rate) if row else None,
+        )
+
+    return WorkerReport(
+        worker_id=worker_id,
+        date_from=str(window.first_day),
+        date_to=str(window.end_day - timedelta(days=1)),
+        days=[ReportDay(day=str(day), **period(day)) for day in sorted(key for key in periods if key is not None)],
+        **period(None),
+    )
@@ -0,0 +1,131 @@
+from datetime import date
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.routes.statistics.models import TicketDailyStats, TicketTotals
+from src.routes.ticket.models import Ticket
+
+
+ACCEPTED_STATUSES = ["invited", "completed", "skipped"]
+
+
+def count_where(*criteria):
+    """``SUM(count) FILTER (WHERE ...)`` over ticket_daily_stats, 0 when nothing matches."""
+    return func.coalesce(func.sum(TicketDailyStats.count).filter(*criteria), 0)
+
+
+class TicketState(NamedTuple):
+    """The part of a ticket that ticket_daily_stats is keyed and summed on."""
+    day: date
+    category_id: int
+    worker_id: int
+    status: str
+    service_seconds: float = 0
+
+    @classmethod
+    def of(cls, ticket: Ticket) -> "TicketState":
+        service_seconds = 0
+        if ticket.status == "completed" and ticket.start_time and ticket.end_time:
+            service_seconds = (ticket.end_time - ticket.start_time).total_seconds()
+        return cls(ticket.created_day, ticket.category_id, ticket.worker_id or 0, ticket.status, service_seconds)
+
+
+async def record_changes(db: AsyncSession, changes: Iterable[tuple[Optional[TicketState], Optional[TicketState]]]):
+    """Apply ``(before, after)`` ticket state changes to ticket_daily_stats.
+
+    ``before`` is None for new tickets and ``after`` is None for deleted ones. The
+    upserts run in the caller's transaction, so the rollup and ticket_totals
+    commit together with the status change they describe.
+    """
+    deltas = {}
+    totals = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            key = state[:4]
+            count, seconds = deltas.get(key, (0, 0))
+            deltas[key] = (count + sign, seconds + sign * state.service_seconds)
+            totals_key = (state.category_id, state.status)
+            totals[totals_key] = totals.get(totals_key, 0) + sign
+
+    rows = [
+        {"day": day, "category_id": category_id, "worker_id": worker_id, "status": status,
+         "count": count, "total_service_seconds": seconds}
+        for (day, category_id, worker_id, status), (count, seconds) in deltas.items()
+        if count or seconds
+    ]
+    if not rows:
+        return
+
+    stmt = insert(TicketDailyStats).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[TicketDailyStats.day, TicketDailyStats.category_id,
+                        TicketDailyStats.worker_id, TicketDailyStats.status],
+        set_={
+            "count": TicketDailyStats.count + stmt.excluded["count"],
+            "total_service_seconds": TicketDailyStats.total_service_seconds + stmt.excluded["total_service_seconds"],
+        }
+    ))
+
+    totals_rows = [
+        {"category_id": category_id, "status": status, "count": count}
+        for (category_id, status), count in totals.items()
+        if count
+    ]
+    if totals_rows:
+        await _add_totals(db, totals_rows)
+
+
+async def _add_totals(db: AsyncSession, rows: list[dict]):
+    stmt = insert(TicketTotals).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[TicketTotals.category_id, TicketTotals.status],
+        set_={"count": TicketTotals.count + stmt.excluded["count"]}
+    ))
+
+
+async def reconcile_totals(db: AsyncSession) -> list[tuple[int, str, int, int]]:
+    """Recount ticket_totals from tickets and tickets_archive and correct any drift.
+
+    The recount and the read of ticket_totals run in one REPEATABLE READ
+    snapshot. record_changes updates tickets and ticket_totals in the same
+    transaction, so within that snapshot ``actual - stored`` is exactly the
+    drift, and it stays correct when added later as a delta, whatever was
+    written in between. Nothing is locked, so ticket writes carry on during
+    the full scan. Runs from the nightly scheduler. Returns the corrected
+    ``(category_id, status, stored, actual)`` rows.
+    """
+    await db.commit()
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    actual_result = await db.execute(text(
+        "SELECT category_id, status, count(*) FROM ("
+        "SELECT category_id, status FROM tickets "
+        "UNION ALL SELECT category_id, status FROM tickets_archive"
+        ") AS all_tickets GROUP BY category_id, status"
+    ))
+    actual = {(category_id, status): count for category_id, status, count in actual_result.all()}
+    stored_result = await db.execute(select(TicketTotals.category_id, TicketTotals.status, TicketTotals.count))
+    stored = {(category_id, status): count for category_id, status, count in stored_result.all()}
+
+    # Ends the snapshot; the corrections are applied in a new READ COMMITTED transaction
+    await db.commit()
+
+    corrections = [
+        (category_id, status, stored.get((category_id, status), 0), actual.get((category_id, status), 0))
+        for category_id, status in sorted(actual.keys() | stored.keys())
+        if stored.get((category_id, status), 0) != actual.get((category_id, status), 0)
+    ]
+    if corrections:
+        await _add_totals(db, [
+            {"category_id": category_id, "status": status, "count": actual_count - stored_count}
+            for category_id, status, stored_count, actual_count in corrections
+        ])
+        await db.commit()
+    return corrections
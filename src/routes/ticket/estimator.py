@@ -0,0 +1,163 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.routes.ticket.models import Ticket
+from src.utils.time_window import time_windows
+
+
+class P2Quantile:
+    """Streaming quantile estimate in constant memory (Jain & Chlamtac P² algorithm)."""
+
+    def __init__(self, q: float):
+        self.q = q
+        self.heights: list[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, value: float):
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in range(1, 4):
+            d = self.desired[i] - self.positions[i]
+            if (d >= 1 and self.positions[i + 1] - self.positions[i] > 1) or \
+                    (d <= -1 and self.positions[i - 1] - self.positions[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        self.positions[i + step] - self.positions[i])
+                heights[i] = height
+                self.positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        n, h = self.positions, self.heights
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            index = round(self.q * (len(self.heights) - 1))
+            return self.heights[index]
+        return self.heights[2]
+
+
+class CategoryServiceTime:
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.count = 0
+        self.mean: Optional[float] = None
+        self.p50 = P2Quantile(0.5)
+        self.p90 = P2Quantile(0.9)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.mean = seconds if self.mean is None else self.mean + self.alpha * (seconds - self.mean)
+        self.p50.add(seconds)
+        self.p90.add(seconds)
+
+
+class ServiceTimeEstimator:
+    """Per-category rolling estimate of ``end_time - start_time``, updated in O(1) per completion.
+
+    Completions observed in one worker process are published to the others
+    through ``listeners`` and replayed there with ``apply_event``.
+    """
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.categories: Dict[int, CategoryServiceTime] = {}
+        self.listeners: List[Callable[[list], None]] = []
+        # Completions seen while a rebuild is reading its snapshot, replayed on top of it
+        self.deferred: Optional[List[list]] = None
+
+    async def rebuild(self, db: AsyncSession):
+        self.deferred = []
+        try:
+            result = await db.execute(
+                select(Ticket.category_id, Ticket.start_time, Ticket.end_time)
+                .where(
+                    Ticket.status == "completed",
+                    Ticket.start_time.isnot(None),
+                    *time_windows.today().where(Ticket.end_time)
+                )
+                .order_by(Ticket.end_time)
+            )
+            rows = result.all()
+        finally:
+            deferred, self.deferred = self.deferred, None
+        self.categories.clear()
+        for row in rows:
+            if row.end_time >= row.start_time:
+                self._add(row.category_id, (row.end_time - row.start_time).total_seconds())
+        for event in deferred:
+            self.apply_event(event)
+
+    def observe(self, category_id: int, start_time: Optional[datetime], end_time: Optional[datetime]):
+        if start_time is None or end_time is None or end_time < start_time:
+            return
+        event = [category_id, (end_time - start_time).total_seconds()]
+        self.apply_event(event)
+        for listener in self.listeners:
+            listener(event)
+
+    def apply_event(self, event: list):
+        """Add a completion, local or published by another process."""
+        if self.deferred is not None:
+            self.deferred.append(event)
+        else:
+            self._add(*event)
+
+    def _add(self, category_id: int, seconds: float):
+        stats = self.categories.get(category_id)
+        if stats is None:
+            stats = self.categories[category_id] = CategoryServiceTime(self.alpha)
+        stats.add(seconds)
+
+    def mean(self, category_id: int) -> Optional[float]:
+        stats = self.categories.get(category_id)
+        return stats.mean if stats else None
+
+    def percentiles(self, category_id: int) -> tuple[Optional[float], Optional[float]]:
+        """Median and 90th percentile service time in seconds."""
+        stats = self.categories.get(category_id)
+        if stats is None:
+            return None, None
+        return stats.p50.value(), stats.p90.value()
+
+    def eta(self, category_id: int, front_queue: int, active_windows: int) -> Optional[float]:
+        """Expected wait in seconds for a client with ``front_queue`` people ahead."""
+        mean = self.mean(category_id)
+        if mean is None:
+            return None
+        return front_queue * mean / max(active_windows, 1)
+
+
+service_time_estimator = ServiceTimeEstimator()
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.future import select
+
+from src.database import async_session_maker
+from src.routes.ticket.models import Ticket
+
+EXPORT_COLUMNS = [
+    Ticket.id, Ticket.number, Ticket.full_name, Ticket.phone_number, Ticket.category_id,
+    Ticket.worker_id, Ticket.status, Ticket.rate, Ticket.language,
+    Ticket.created_at, Ticket.start_time, Ticket.end_time,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_query(worker_id: Optional[int] = None, category_id: Optional[int] = None,
+                 status: Optional[str] = None, date_from: Optional[date] = None,
+                 date_to: Optional[date] = None):
+    query = select(*EXPORT_COLUMNS).order_by(Ticket.created_at, Ticket.id)
+    if worker_id is not None:
+        query = query.where(Ticket.worker_id == worker_id)
+    if category_id is not None:
+        query = query.where(Ticket.category_id == category_id)
+    if status is not None:
+        query = query.where(Ticket.status == status)
+    # created_day bounds let the planner prune monthly partitions
+    if date_from is not None:
+        query = query.where(Ticket.created_day >= date_from,
+                            Ticket.created_at >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        query = query.where(Ticket.created_day <= date_to,
+                            Ticket.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    return query
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps({field: _value(value) for field, value in zip(EXPORT_FIELDS, row)}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+async def stream_tickets(query, export_format: str = "csv") -> AsyncIterator[str]:
+    """Yield the export ``EXPORT_BATCH_SIZE`` rows at a time from a server-side cursor.
+
+    The generator opens its own session: it is consumed by StreamingResponse
+    after the endpoint (and its request-scoped session) has returned.
+    """
+    if export_format == "csv":
+        yield _csv_chunk([], header=True)
+    async with async_session_maker() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield _csv_chunk(rows) if export_format == "csv" else _ndjson_chunk(rows)
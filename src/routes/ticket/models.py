@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, BigInteger, Index, text
 from sqlalchemy.orm import relationship
 from src.database import Base
 from src.routes.auth.models import User
@@ -10,13 +10,42 @@ def current_time_plus_5():
     return datetime.utcnow() + timedelta(hours=5)
 
 
+def current_date_plus_5():
+    return current_time_plus_5().date()
+
+
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Dispatch: next waiting ticket of a category in arrival order
+        Index("ix_tickets_wait_queue", "category_id", "created_at", "id",
+              postgresql_where=text("status = 'wait'")),
+        # Current ticket of a worker
+        Index("ix_tickets_invited_worker", "worker_id",
+              postgresql_where=text("status = 'invited'")),
+        Index("ix_tickets_invited_category", "category_id", "created_at",
+              postgresql_where=text("status = 'invited'")),
+        # Dashboard and statistics counters
+        Index("ix_tickets_category_status_created", "category_id", "status", "created_at"),
+        Index("ix_tickets_worker_status_created", "worker_id", "status", "created_at"),
+        # Keyset pagination of ticket lists, see src/utils/pagination.py
+        Index("ix_tickets_created_at", "created_at", "id"),
+        Index("ix_tickets_worker_created", "worker_id", "created_at", "id"),
+        # Telegram bot lookups
+        Index("ix_tickets_token", "token"),
+        # A client can wait only once per category (kiosk double-taps)
+        Index("uq_tickets_waiting_client", "full_name", "phone_number", "category_id", "created_day",
+              unique=True, postgresql_where=text("status = 'wait'")),
+        # Monthly partitions, see src/routes/ticket/partitions.py
+        {"postgresql_partition_by": "RANGE (created_day)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     full_name = Column(String, unique=False, nullable=False)
     phone_number = Column(String, unique=False, nullable=False)
     created_at = Column(DateTime, default=current_time_plus_5)
+    # Partition key, always the date of created_at
+    created_day = Column(Date, primary_key=True, default=current_date_plus_5)
     start_time = Column(DateTime, nullable=True)
     end_time = Column(DateTime, nullable=True)
     category_id = Column(Integer, ForeignKey(Category.id), nullable=False)
@@ -0,0 +1,82 @@
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.routes.ticket.models import current_date_plus_5
+
+# tickets is range-partitioned by created_day, one partition per month:
+# tickets_y2024m10 holds [2024-10-01, 2024-11-01)
+
+# Advisory lock key serializing partition DDL between the uvicorn workers and the scheduler
+PARTITIONS_LOCK = 718_204_512
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+async def lock_partitions(db: AsyncSession):
+    """Hold the partition DDL lock until the caller's transaction ends.
+
+    CREATE TABLE IF NOT EXISTS ... PARTITION OF is not safe to run concurrently:
+    two workers starting together can both pass the existence check and the
+    second fails on the duplicate relation.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITIONS_LOCK})
+
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int = 2):
+    """Create the partitions for the current month and the next ``months_ahead`` months."""
+    await lock_partitions(db)
+    current = month_start(current_date_plus_5())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name('tickets', month)} "
+            f"PARTITION OF tickets FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        ))
+    await db.commit()
+
+
+async def archive_partitions(db: AsyncSession, keep_months: int):
+    """Move partitions older than ``keep_months`` months from tickets to tickets_archive.
+
+    Detached partitions keep their data and indexes; they are attached to the
+    identically partitioned tickets_archive table so history stays queryable
+    without weighing on the hot table.
+    """
+    await lock_partitions(db)
+    cutoff = add_months(month_start(current_date_plus_5()), -keep_months)
+    result = await db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'tickets' ORDER BY child.relname"
+    ))
+    archived = []
+    for (name,) in result.all():
+        match = re.fullmatch(r"tickets_y(\d{4})m(\d{2})", name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if month >= cutoff:
+            continue
+        await db.execute(text(f"ALTER TABLE tickets DETACH PARTITION {name}"))
+        await db.execute(text(
+            f"ALTER TABLE tickets_archive ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        ))
+        archived.append(name)
+    await db.commit()
+    return archived
@@ -0,0 +1,121 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.routes.ticket.models import Ticket
+
+
+class WaitQueueIndex:
+    """In-process ordered view of waiting and invited tickets per category.
+
+    Waiting tickets are kept sorted by ``(created_at, id)`` - the same order the
+    dispatch endpoints use - so a position lookup is a bisect instead of a
+    ``SELECT`` of every ticket ahead of the caller.
+    """
+
+    def __init__(self):
+        self.waiting: Dict[int, List[Tuple[datetime, int]]] = {}
+        self.serving: Dict[int, Dict[int, Tuple[datetime, int, str]]] = {}
+        self.tickets: Dict[int, Tuple[int, Tuple[datetime, int]]] = {}
+        # Called with every local change so other worker processes can replay it
+        self.listeners: List[Callable[[list], None]] = []
+        # Changes seen while a rebuild is reading its snapshot, replayed on top of it
+        self.deferred: Optional[List[list]] = None
+
+    async def rebuild(self, db: AsyncSession):
+        self.deferred = []
+        try:
+            result = await db.execute(
+                select(Ticket.id, Ticket.category_id, Ticket.created_at, Ticket.number, Ticket.status)
+                .where(Ticket.status.in_(["wait", "invited"]))
+            )
+            rows = result.all()
+        finally:
+            deferred, self.deferred = self.deferred, None
+        self.waiting.clear()
+        self.serving.clear()
+        self.tickets.clear()
+        for row in rows:
+            self._place(row.id, row.category_id, row.created_at, row.number, row.status)
+        for event in deferred:
+            self.apply_event(event)
+        print(f"Queue index rebuilt: {len(self.tickets)} waiting tickets, {len(deferred)} changes replayed")
+
+    def apply(self, ticket: Ticket):
+        """Sync the index with the current state of ``ticket``."""
+        self._change(["apply", ticket.id, ticket.category_id, ticket.created_at.isoformat(),
+                      ticket.number, ticket.status])
+
+    def discard(self, ticket_id: int):
+        self._change(["discard", ticket_id])
+
+    def clear_waiting(self):
+        self._change(["clear_waiting"])
+
+    def _change(self, event: list):
+        self.apply_event(event)
+        for listener in self.listeners:
+            listener(event)
+
+    def apply_event(self, event: list):
+        """Apply a change, local or published by another process."""
+        if self.deferred is not None:
+            self.deferred.append(event)
+        elif event[0] == "apply":
+            _, ticket_id, category_id, created_at, number, status = event
+            self._discard(ticket_id)
+            self._place(ticket_id, category_id, datetime.fromisoformat(created_at), number, status)
+        elif event[0] == "discard":
+            self._discard(event[1])
+        elif event[0] == "clear_waiting":
+            self._clear_waiting()
+
+    def _discard(self, ticket_id: int):
+        entry = self.tickets.pop(ticket_id, None)
+        if entry is not None:
+            category_id, key = entry
+            queue = self.waiting[category_id]
+            del queue[bisect_left(queue, key)]
+        for serving in self.serving.values():
+            serving.pop(ticket_id, None)
+
+    def _clear_waiting(self):
+        self.waiting.clear()
+        self.tickets.clear()
+
+    def position(self, category_id: int, created_at: datetime, ticket_id: int) -> int:
+        """Number of waiting tickets ahead of the given one."""
+        return bisect_left(self.waiting.get(category_id, []), (created_at, ticket_id))
+
+    def position_by_id(self, ticket_id: int) -> Optional[int]:
+        entry = self.tickets.get(ticket_id)
+        if entry is None:
+            return None
+        category_id, key = entry
+        return bisect_left(self.waiting[category_id], key)
+
+    def length(self, category_id: int) -> int:
+        return len(self.waiting.get(category_id, []))
+
+    def serving_count(self, category_id: int) -> int:
+        return len(self.serving.get(category_id, {}))
+
+    def now_serving(self, category_id: int) -> Optional[str]:
+        serving = self.serving.get(category_id)
+        if not serving:
+            return None
+        return min(serving.values())[2]
+
+    def _place(self, ticket_id: int, category_id: int, created_at: datetime, number: str, status: str):
+        if status == "wait":
+            key = (created_at, ticket_id)
+            insort(self.waiting.setdefault(category_id, []), key)
+            self.tickets[ticket_id] = (category_id, key)
+        elif status == "invited":
+            self.serving.setdefault(category_id, {})[ticket_id] = (created_at, ticket_id, number)
+
+
+queue_index = WaitQueueIndex()
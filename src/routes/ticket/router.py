@@ -1,18 +1,28 @@
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy import select, func, desc
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database import get_async_session
 from src.routes.auth import auth
 from src.routes.auth.schemas import UserOut
-from src.routes.category.models import Category
 from src.routes.ticket.models import Ticket
-from src.routes.ticket.schemas import TicketCreate, TicketUpdate, TicketOut
-from src.routes.ticket.ticket import create_ticket, rate_ticket, update_ticket, delete_ticket, get_tickets, get_ticket
+from src.routes.ticket.queue import queue_index
+from src.routes.ticket.export import export_query, stream_tickets
+from src.routes.ticket.serialization import select_ticket_rows, ticket_page_response
+from src.routes.ticket.schemas import TicketCreate, TicketUpdate, TicketOut, TicketPage
+from src.routes.ticket.ticket import create_ticket, rate_ticket, update_ticket, delete_ticket, get_tickets, get_ticket, \
+    dispatch_next_ticket, create_tickets_bulk, MAX_BULK_TICKETS
 from src.routes.websocket.router import manager
 from src.schemas import QueueResponse, CurrentTicketWorker
+from src.utils.pagination import DEFAULT_PAGE_SIZE, paginate_tickets
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
 
 router = APIRouter(
     prefix="/ticket",
@@ -24,6 +34,11 @@ async def create_ticket_endpoint(ticket: TicketCreate, db: AsyncSession = Depend
     ticket_data = ticket.dict()
     return await create_ticket(db, ticket_data)
 
+@router.post("/bulk", response_model=list[TicketOut], status_code=status.HTTP_201_CREATED)
+async def create_tickets_bulk_endpoint(tickets: list[TicketCreate] = Body(..., max_length=MAX_BULK_TICKETS),
+                                       db: AsyncSession = Depends(get_async_session)):
+    return await create_tickets_bulk(db, [ticket.dict() for ticket in tickets])
+
 @router.put("/{ticket_id}", response_model=TicketOut)
 async def update_ticket_endpoint(ticket_id: int, ticket: TicketUpdate, db: AsyncSession = Depends(get_async_session)):
     return await update_ticket(db, ticket_id, ticket)
@@ -32,9 +47,35 @@ async def update_ticket_endpoint(ticket_id: int, ticket: TicketUpdate, db: Async
 async def delete_ticket_endpoint(ticket_id: int, db: AsyncSession = Depends(get_async_session)):
     return await delete_ticket(db, ticket_id)
 
-@router.get("/", response_model=list[TicketOut])
-async def get_tickets_endpoint(db: AsyncSession = Depends(get_async_session)):
-    return await get_tickets(db)
+@router.get("/", response_model=TicketPage)
+async def get_tickets_endpoint(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                               db: AsyncSession = Depends(get_async_session)):
+    tickets, next_cursor = await get_tickets(db, cursor, limit)
+    return ticket_page_response(tickets, next_cursor)
+
+@router.get("/export")
+async def export_tickets_endpoint(
+        token: str,
+        export_format: str = Query("csv", alias="format"),
+        worker_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        db: AsyncSession = Depends(get_async_session)):
+    # The export holds every client's name and phone number: admins only
+    admin = await auth.get_current_user(db, token)
+    if admin.is_admin is False:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid export format")
+
+    query = export_query(worker_id, category_id, status, date_from, date_to)
+    return StreamingResponse(
+        stream_tickets(query, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=tickets.{export_format}"}
+    )
 
 @router.get("/{ticket_id}", response_model=TicketOut)
 async def get_ticket_endpoint(ticket_id: int, db: AsyncSession = Depends(get_async_session)):
@@ -48,52 +89,30 @@ async def skip_and_get_next_ticket(request: Request, db: AsyncSession = Depends(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
     worker: UserOut = await auth.get_current_user(db, worker_token)
 
-    current = await db.execute(
-        select(Ticket).where(Ticket.worker_id == worker.id, Ticket.status == "invited")
-    )
-    current = current.scalars().first()
-    if current is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
-
-    ticket_data = TicketUpdate(status="skipped")
-    current_ticket = await update_ticket(db, current.id, ticket_data)
-
-    await manager.broadcast({
-        "action": "skip_ticket",
-        "category_id": current_ticket.category_id,
-        "data": TicketOut.from_orm(current_ticket).dict()
-    })
-
-    next_ticket_result = await db.execute(
-        select(Ticket).where(
-            Ticket.category_id == current_ticket.category_id,
-            Ticket.status == "wait",
-            Ticket.worker_id == None
-        ).order_by(Ticket.created_at)
-    )
-    next_ticket = next_ticket_result.scalars().first()
-    if not next_ticket:
+    skipped_ticket, next_ticket, category_name = await dispatch_next_ticket(db, worker, "skipped")
+    if next_ticket is None:
+        await manager.broadcast({
+            "action": "skip_ticket",
+            "category_id": skipped_ticket.category_id,
+            "data": TicketOut.from_orm(skipped_ticket).dict()
+        })
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No available tickets")
-    next_ticket.status = "invited"
-    next_ticket.worker_id = worker.id
-    db.add(next_ticket)
-    await db.commit()
-    await db.refresh(next_ticket)
-
-    category = await db.execute(select(Category).where(Category.id == next_ticket.category_id))
-    category = category.scalars().first()
 
     await manager.broadcast({
         "action": "next_ticket",
         "category_id": next_ticket.category_id,
-        "data": {"ticket": TicketOut.from_orm(next_ticket).dict(), "window": worker.window}
+        "data": {
+            "ticket": TicketOut.from_orm(next_ticket).dict(),
+            "window": worker.window,
+            "previous": TicketOut.from_orm(skipped_ticket).dict()
+        }
     })
 
     return CurrentTicketWorker(
         ticket_data=TicketOut.from_orm(next_ticket),
         ticket_id=next_ticket.id,
         ticket_number=int(next_ticket.number),
-        category_name=category.name,
+        category_name=category_name,
         ticket_created_time=next_ticket.created_at.strftime("%d.%m.%Y %H:%M"),
         ticket_language=next_ticket.language,
         ticket_phone_number=next_ticket.phone_number,  # Изменено с email на phone_number
@@ -121,37 +140,34 @@ async def get_current_ticket(request: Request, db: AsyncSession = Depends(get_as
 
 @router.get("/{ticket_id}/queue", response_model=QueueResponse)
 async def get_queue_by_ticket_id(ticket_id: int, db: AsyncSession = Depends(get_async_session)):
-    # Retrieve the ticket with the specified ticket_id
-    ticket_stmt = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
-    ticket = ticket_stmt.scalars().first()
+    front_queue = queue_index.position_by_id(ticket_id)
+    if front_queue is not None:
+        return {"queue": front_queue}
+
+    # Ticket is no longer waiting: count the waiting tickets created before it
+    ticket_stmt = await db.execute(
+        select(Ticket.category_id, Ticket.created_at).where(Ticket.id == ticket_id)
+    )
+    ticket = ticket_stmt.first()
 
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
-    # Calculate the queue length
-    queue_stmt = await db.execute(
-        select(Ticket).where(
-            Ticket.category_id == ticket.category_id,
-            Ticket.status == "wait",
-            Ticket.id < ticket.id
-        )
-    )
-    front_queue = len(queue_stmt.scalars().all())
+    front_queue = queue_index.position(ticket.category_id, ticket.created_at, ticket_id)
 
     return {"queue": front_queue}
 
-@router.get('/worker/{worker_id}/all/', response_model=List[TicketOut])
-async def get_all_by_worker_id_all(worker_id: int, db: AsyncSession = Depends(get_async_session)):
+@router.get('/worker/{worker_id}/all/', response_model=TicketPage)
+async def get_all_by_worker_id_all(worker_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                                   db: AsyncSession = Depends(get_async_session)):
     worker: UserOut = await auth.get_user_by_id(db, worker_id)
     if not worker:
         raise HTTPException(status_code=404, detail="Worker not found")
 
-    query = select(Ticket).where(Ticket.worker_id == worker_id).order_by(desc(Ticket.created_at))
-
-    result = await db.execute(query)
-    tickets = result.scalars().all()
+    query = select_ticket_rows().where(Ticket.worker_id == worker_id)
+    tickets, next_cursor = await paginate_tickets(db, query, cursor, limit)
 
-    return tickets
+    return ticket_page_response(tickets, next_cursor)
 
 @router.post("/rate/{ticket_id}", response_model=TicketOut)
 async def set_rate_ticket(ticket_id: int, request: Request, db: AsyncSession = Depends(get_async_session)):
@@ -41,6 +41,11 @@ class TicketOut(BaseModel):
         from_attributes = True
 
 
+class TicketPage(BaseModel):
+    items: list[TicketOut]
+    next_cursor: Optional[str] = None
+
+
 class TicketFilter(BaseModel):
     date_filter: Optional[str] = Field(
         None, description="Options: 1_day, 1_week, 1_month", example="1_day"
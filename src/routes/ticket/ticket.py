@@ -1,5 +1,11 @@
 import random
 import string
+from datetime import datetime
+from typing import Optional
+
+import pytz
+from sqlalchemy import text, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status, Request
@@ -7,46 +13,94 @@ from fastapi import HTTPException, status, Request
 from src.routes.global_counter.counter import get_current_counter, increment_counter
 from src.routes.auth import auth
 from src.routes.auth.schemas import UserOut
-from src.routes.ticket.models import Ticket
+from src.routes.ticket.models import Ticket, current_time_plus_5
+from src.routes.ticket.queue import queue_index
+from src.routes.ticket.estimator import service_time_estimator
+from src.routes.statistics.stats import TicketState, record_changes
+from src.routes.statistics.cache import statistics_cache
+from src.routes.statistics.ratings import record_rating
 from src.routes.category.models import Category
 from src.routes.websocket.router import manager
 from src.routes.ticket.schemas import TicketOut
-
-async def create_ticket(db: AsyncSession, ticket_data: dict) -> Ticket:
-    existing_ticket = await db.execute(
-        select(Ticket).where(
-            Ticket.full_name == ticket_data['full_name'],
-            Ticket.phone_number == ticket_data['phone_number'],
-            Ticket.category_id == ticket_data['category_id'],
-            Ticket.status == 'wait'
+from src.routes.ticket.serialization import select_ticket_rows, tickets_out_json
+from src.utils.pagination import DEFAULT_PAGE_SIZE, paginate_tickets
+
+LANGUAGE_MAPPING = {
+    'ru': 'Русский',
+    'kz': 'Қазақ',
+    'en': 'English'
+}
+
+
+# Inserts tried when the conflicting waiting ticket keeps leaving the queue between attempts
+CREATE_ATTEMPTS = 3
+# Tickets per bulk request; the multi-row INSERT binds 8 parameters per ticket
+# and asyncpg allows at most 32767 per statement
+MAX_BULK_TICKETS = 1000
+
+
+def create_ticket_token():
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=32))
+
+
+def insert_waiting_tickets(rows: list[dict]):
+    # created_day is the partition key and must match created_at
+    created_at = current_time_plus_5()
+    for row in rows:
+        row['created_at'] = created_at
+        row['created_day'] = created_at.date()
+    # uq_tickets_waiting_client rejects a second waiting ticket of the same client on the same day
+    return (
+        insert(Ticket)
+        .values(rows)
+        .on_conflict_do_nothing(
+            index_elements=[Ticket.full_name, Ticket.phone_number, Ticket.category_id, Ticket.created_day],
+            # A literal, not a bind parameter: once asyncpg's prepared statement goes to
+            # a generic plan, a parameterized predicate no longer matches the partial index
+            index_where=text("status = 'wait'")
         )
+        .returning(Ticket)
     )
-    existing_ticket = existing_ticket.scalars().first()
 
-    if existing_ticket:
-        return existing_ticket
 
-    language_mapping = {
-        'ru': 'Русский',
-        'kz': 'Қазақ',
-        'en': 'English'
-    }
-
-    ticket_data['language'] = language_mapping.get(
+async def create_ticket(db: AsyncSession, ticket_data: dict) -> Ticket:
+    ticket_data['language'] = LANGUAGE_MAPPING.get(
         ticket_data['language'], None)
 
-    token = ''.join(random.choices(string.ascii_letters + string.digits, k=32))
-    new_ticket = Ticket(**ticket_data, number="0", token=token)
+    token = create_ticket_token()
 
     try:
-        db.add(new_ticket)
-        await db.flush()
-        current_counter = await increment_counter(db)
-
-        new_ticket.number = f"{current_counter:03d}"
-
+        for _ in range(CREATE_ATTEMPTS):
+            current_counter = await increment_counter(db)
+            row = dict(**ticket_data, number=f"{current_counter:03d}", token=token)
+            result = await db.execute(insert_waiting_tickets([row]))
+            new_ticket = result.scalars().first()
+            if new_ticket is not None:
+                break
+
+            # Duplicate: roll back the allocated number and return the waiting ticket
+            await db.rollback()
+            existing_ticket = await db.execute(
+                select(Ticket).where(
+                    Ticket.full_name == ticket_data['full_name'],
+                    Ticket.phone_number == ticket_data['phone_number'],
+                    Ticket.category_id == ticket_data['category_id'],
+                    Ticket.created_day == row['created_day'],
+                    Ticket.status == 'wait'
+                )
+            )
+            existing_ticket = existing_ticket.scalars().first()
+            if existing_ticket is not None:
+                return existing_ticket
+            # The conflicting ticket was invited or deleted in between: the insert can succeed now
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Waiting ticket of this client is being changed, try again")
+
+        await record_changes(db, [(None, TicketState.of(new_ticket))])
         await db.commit()
-        await db.refresh(new_ticket)
+        queue_index.apply(new_ticket)
+        statistics_cache.invalidate()
 
         await manager.broadcast({
             "action": "new_ticket",
@@ -61,6 +115,47 @@ async def create_ticket(db: AsyncSession, ticket_data: dict) -> Ticket:
     return new_ticket
 
 
+async def create_tickets_bulk(db: AsyncSession, tickets_data: list[dict]) -> list[Ticket]:
+    """Issue a group of tickets with one number reservation, one multi-row insert and one commit."""
+    rows = {}
+    for ticket_data in tickets_data:
+        key = (ticket_data['full_name'], ticket_data['phone_number'], ticket_data['category_id'])
+        rows.setdefault(key, dict(ticket_data, language=LANGUAGE_MAPPING.get(ticket_data['language'], None)))
+    if not rows:
+        return []
+
+    try:
+        # Reserve a contiguous block of numbers
+        last_number = await increment_counter(db, step=len(rows))
+        first_number = last_number - len(rows) + 1
+        for number, row in enumerate(rows.values(), start=first_number):
+            row['number'] = f"{number:03d}"
+            row['token'] = create_ticket_token()
+
+        result = await db.execute(insert_waiting_tickets(list(rows.values())))
+        new_tickets = sorted(result.scalars().all(), key=lambda ticket: ticket.id)
+        await record_changes(db, [(None, TicketState.of(ticket)) for ticket in new_tickets])
+        await db.commit()
+        statistics_cache.invalidate()
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+    by_category = {}
+    for ticket in new_tickets:
+        queue_index.apply(ticket)
+        by_category.setdefault(ticket.category_id, []).append(TicketOut.from_orm(ticket).dict())
+
+    for category_id, tickets in by_category.items():
+        await manager.broadcast({
+            "action": "new_tickets",
+            "category_id": category_id,
+            "data": tickets
+        })
+
+    return new_tickets
+
+
 async def update_ticket(db: AsyncSession, ticket_id: int, ticket_data):
     result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
     db_ticket = result.scalars().first()
@@ -69,12 +164,16 @@ async def update_ticket(db: AsyncSession, ticket_id: int, ticket_data):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
 
+    before = TicketState.of(db_ticket)
     for key, value in ticket_data.dict(exclude_unset=True).items():
         setattr(db_ticket, key, value)
 
     db.add(db_ticket)
+    await record_changes(db, [(before, TicketState.of(db_ticket))])
     await db.commit()
     await db.refresh(db_ticket)
+    queue_index.apply(db_ticket)
+    statistics_cache.invalidate()
 
     await manager.broadcast({
         "action": "update_ticket",
@@ -85,6 +184,77 @@ async def update_ticket(db: AsyncSession, ticket_id: int, ticket_data):
     return db_ticket
 
 
+async def dispatch_next_ticket(db: AsyncSession, worker: UserOut, finished_status: str = "completed"):
+    """Finish the worker's invited ticket and claim the next waiting one in one transaction.
+
+    The next ticket is picked with ``FOR UPDATE SKIP LOCKED`` so concurrent windows
+    never invite the same ticket. Returns ``(finished_ticket, next_ticket, category_name)``;
+    ``next_ticket`` is None when the queue is empty.
+    """
+    now = datetime.now(pytz.timezone('Asia/Almaty')).replace(tzinfo=None)
+
+    finished_values = {"status": finished_status}
+    if finished_status == "completed":
+        finished_values["end_time"] = now
+    finished_result = await db.execute(
+        update(Ticket)
+        .where(Ticket.worker_id == worker.id, Ticket.status == "invited")
+        .values(**finished_values)
+        .returning(Ticket)
+    )
+    finished_tickets = finished_result.scalars().all()
+    finished_ticket = finished_tickets[0] if finished_tickets else None
+
+    if finished_status == "skipped":
+        if finished_ticket is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+        category_id = finished_ticket.category_id
+    else:
+        category_id = worker.category_id
+
+    next_ticket_id = (
+        select(Ticket.id)
+        .where(Ticket.category_id == category_id, Ticket.status == "wait", Ticket.worker_id == None)
+        .order_by(Ticket.created_at, Ticket.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    category_name = select(Category.name).where(Category.id == Ticket.category_id).scalar_subquery()
+    next_result = await db.execute(
+        update(Ticket)
+        .where(Ticket.id == next_ticket_id)
+        .values(status="invited", worker_id=worker.id, start_time=now)
+        .returning(Ticket, category_name)
+    )
+    next_row = next_result.first()
+
+    changes = [
+        (TicketState.of(ticket)._replace(status="invited", service_seconds=0), TicketState.of(ticket))
+        for ticket in finished_tickets
+    ]
+    if next_row is not None:
+        claimed = TicketState.of(next_row[0])
+        changes.append((claimed._replace(status="wait", worker_id=0), claimed))
+    await record_changes(db, changes)
+    await db.commit()
+    if changes:
+        statistics_cache.invalidate()
+
+    if finished_ticket is not None:
+        queue_index.apply(finished_ticket)
+        if finished_status == "completed":
+            service_time_estimator.observe(
+                finished_ticket.category_id, finished_ticket.start_time, finished_ticket.end_time)
+    if next_row is None:
+        return finished_ticket, None, None
+
+    next_ticket, category_name = next_row
+    queue_index.apply(next_ticket)
+    return finished_ticket, next_ticket, category_name
+
+
 async def update_ticket_telegram_id(db: AsyncSession, token: str, telegram_id: int):
     result = await db.execute(select(Ticket).where(Ticket.token == token))
     db_ticket = result.scalars().first()
@@ -110,23 +280,26 @@ async def delete_ticket(db: AsyncSession, ticket_id: int):
             status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
 
     await db.delete(db_ticket)
+    await record_changes(db, [(TicketState.of(db_ticket), None)])
+    await record_rating(db, db_ticket.category_id, db_ticket.worker_id, db_ticket.rate, None)
     await db.commit()
+    queue_index.discard(ticket_id)
+    statistics_cache.invalidate()
 
     # Notify via WebSocket for the category
     await manager.broadcast({
         "action": "delete_ticket",
+        "category_id": db_ticket.category_id,
         "data": {"ticket_id": ticket_id}
-    }, db_ticket.category_id)
+    })
     # Notify via WebSocket for the general queue
     await update_general_queue(db)
 
     return {"message": "Ticket deleted successfully"}
 
 
-async def get_tickets(db: AsyncSession):
-    result = await db.execute(select(Ticket))
-    tickets = result.scalars().all()
-    return tickets
+async def get_tickets(db: AsyncSession, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE):
+    return await paginate_tickets(db, select_ticket_rows(), cursor, limit)
 
 
 async def get_ticket(db: AsyncSession, ticket_id: int):
@@ -163,11 +336,11 @@ async def get_current_ticket(db: AsyncSession, ticket_id: int):
 
 
 async def update_general_queue(db: AsyncSession):
-    result = await db.execute(select(Ticket).where(Ticket.status == "wait").order_by(Ticket.created_at))
-    tickets = result.scalars().all()
+    result = await db.execute(select_ticket_rows().where(Ticket.status == "wait").order_by(Ticket.created_at, Ticket.id))
     await manager.broadcast({
         "action": "general_queue",
-        "data": [TicketOut.from_orm(ticket).dict() for ticket in tickets]
+        "category_id": None,
+        "data": tickets_out_json(result.all())
     })
 
 async def get_time_service_for_ticket(db: AsyncSession, ticket_id: int):
@@ -199,16 +372,24 @@ async def rate_ticket(ticket_id: int, request: Request, db: AsyncSession):
     print(f"RATEEEEEE  {rating}")
     if not rating:
         raise HTTPException(status_code=400, detail="Rating is required")
-    if not 1 <= rating <= 5:
+    if not isinstance(rating, int) or not 1 <= rating <= 5:
         raise HTTPException(status_code=400, detail="Rating should be between 1 and 10")
-    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
-    ticket = result.scalars().first()
-    if not ticket:
+
+    # The locked FROM row still holds the previous rate when RETURNING is evaluated
+    old = select(Ticket.id, Ticket.rate).where(Ticket.id == ticket_id).with_for_update().subquery("old")
+    result = await db.execute(
+        update(Ticket)
+        .where(Ticket.id == old.c.id)
+        .values(rate=rating)
+        .returning(Ticket, old.c.rate.label("old_rate"))
+    )
+    row = result.first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    
-    query = Ticket.__table__.update().values(rate=rating).where(Ticket.id == ticket_id)
-    await db.execute(query)
+
+    ticket, old_rate = row
+    await record_rating(db, ticket.category_id, ticket.worker_id, old_rate, ticket.rate)
     await db.commit()
-    
+
     return ticket
 
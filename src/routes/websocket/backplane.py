@@ -0,0 +1,180 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+
+from src.config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, WS_BACKPLANE_CHANNEL
+
+DSN = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# NOTIFY payloads must stay under 8000 bytes. Event bodies are ASCII JSON and
+# escaping them inside the envelope at most doubles a chunk of CHUNK_CHARS.
+MAX_PAYLOAD = 7900
+CHUNK_CHARS = 3500
+# Parts of a chunked message that never completed are dropped after this many seconds
+PARTIAL_TIMEOUT = 30
+RECONNECT_DELAY = 1
+# Seconds startup waits for the first LISTEN (and the resync it triggers)
+STARTUP_TIMEOUT = 30
+PUBLISH_QUEUE_SIZE = 10000
+
+
+class PostgresBackplane:
+    """Relays events between uvicorn worker processes over LISTEN/NOTIFY.
+
+    Each process handles its own events locally and publishes them here; the
+    other processes receive them on a dedicated listening connection and pass
+    them to the handler registered for the event kind. ``publish`` never
+    blocks: events are queued and sent by a background task on a second
+    connection. Events larger than a NOTIFY payload are split into parts and
+    reassembled by the receivers.
+
+    Notifications sent while the listener is disconnected are lost, so the
+    ``on_listen`` callbacks run after every successful LISTEN, including
+    reconnects, to resync state that is otherwise kept by replaying events.
+    """
+
+    def __init__(self, channel: str = WS_BACKPLANE_CHANNEL, dsn: str = DSN):
+        self.channel = channel
+        self.dsn = dsn
+        self.origin = uuid.uuid4().hex[:12]
+        self.handlers: Dict[str, Callable[[Any], None]] = {}
+        self.on_listen: List[Callable[[], Awaitable[None]]] = []
+        self.listening: Optional[asyncio.Event] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.partial: Dict[Tuple[str, int], Tuple[float, Dict[int, str]]] = {}
+        self.sequence = 0
+        self.dropped = 0
+        self.listener: Optional[asyncpg.Connection] = None
+        self.tasks: list = []
+
+    def subscribe(self, kind: str, handler: Callable[[Any], None]):
+        self.handlers[kind] = handler
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=PUBLISH_QUEUE_SIZE)
+        self.listening = asyncio.Event()
+        self.tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._publish())]
+        try:
+            await asyncio.wait_for(self.listening.wait(), STARTUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Backplane: not listening after {STARTUP_TIMEOUT}s, continuing to retry in the background")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.queue = None
+
+    def publish(self, kind: str, payload: Any):
+        if self.queue is None:
+            return
+        try:
+            self.queue.put_nowait(json.dumps({"k": kind, "p": payload}))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def notify(self, kind: str, payload: Any):
+        """Send one event from a process that does not run the backplane, such as the scheduler."""
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            for part in self.encode(json.dumps({"k": kind, "p": payload})):
+                await connection.execute("SELECT pg_notify($1, $2)", self.channel, part)
+        finally:
+            await connection.close()
+
+    def encode(self, body: str) -> list:
+        self.sequence += 1
+        whole = json.dumps({"o": self.origin, "m": self.sequence, "i": 0, "n": 1, "d": body})
+        if len(whole) <= MAX_PAYLOAD:
+            return [whole]
+        parts = [body[i:i + CHUNK_CHARS] for i in range(0, len(body), CHUNK_CHARS)]
+        return [
+            json.dumps({"o": self.origin, "m": self.sequence, "i": index, "n": len(parts), "d": part})
+            for index, part in enumerate(parts)
+        ]
+
+    def receive(self, payload: str) -> Optional[str]:
+        """Return the complete event body once all its parts have arrived."""
+        envelope = json.loads(payload)
+        if envelope["o"] == self.origin:
+            return None
+        if envelope["n"] == 1:
+            return envelope["d"]
+
+        now = time.monotonic()
+        for key in [key for key, (started, _) in self.partial.items() if now - started > PARTIAL_TIMEOUT]:
+            del self.partial[key]
+        key = (envelope["o"], envelope["m"])
+        _, parts = self.partial.setdefault(key, (now, {}))
+        parts[envelope["i"]] = envelope["d"]
+        if len(parts) < envelope["n"]:
+            return None
+        del self.partial[key]
+        return "".join(parts[index] for index in range(envelope["n"]))
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            body = self.receive(payload)
+            if body is None:
+                return
+            event = json.loads(body)
+            handler = self.handlers.get(event["k"])
+            if handler is not None:
+                handler(event["p"])
+        except Exception as e:
+            print(f"Backplane: failed to handle notification: {str(e)}")
+
+    async def _listen(self):
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                print(f"Backplane: listener connection failed: {str(e)}")
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                print(f"Backplane: listening on {self.channel} as {self.origin}")
+                for callback in self.on_listen:
+                    await callback()
+                self.listening.set()
+                await closed.wait()
+                print("Backplane: listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                await connection.close()
+                raise
+            except Exception as e:
+                print(f"Backplane: listener error: {str(e)}")
+                connection.terminate()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _publish(self):
+        connection = None
+        while True:
+            body = await self.queue.get()
+            try:
+                if connection is None or connection.is_closed():
+                    connection = await asyncpg.connect(self.dsn)
+                for part in self.encode(body):
+                    await connection.execute("SELECT pg_notify($1, $2)", self.channel, part)
+            except asyncio.CancelledError:
+                if connection is not None:
+                    await connection.close()
+                raise
+            except Exception as e:
+                self.dropped += 1
+                print(f"Backplane: publish failed: {str(e)}")
+                if connection is not None:
+                    connection.terminate()
+                connection = None
+                await asyncio.sleep(RECONNECT_DELAY)
+
+
+backplane = PostgresBackplane()
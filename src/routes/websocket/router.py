@@ -1,59 +1,261 @@
-import json
-from typing import List, Dict, Any
+import asyncio
+import logging
+import re
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from src.config import WS_COALESCE_TICK, WS_QUEUE_SIZE, WS_SEND_TIMEOUT, WS_SLOW_CONSUMER_DEADLINE
+
 router = APIRouter(
     tags=["websocket"],
     prefix='/ws'
 )
 
 
+# Topics a client can subscribe to. A client that has not subscribed to anything
+# is a legacy client and keeps receiving every broadcast.
+TOPIC_PATTERN = re.compile(r"^(general|(category|worker|ticket):\d+)$")
+
+
+def message_topics(message: Dict[str, Any]) -> List[str]:
+    """Topics a broadcast is delivered to: its category (``general`` without one)
+    and the tickets and workers it carries."""
+    if message["category_id"] is None:
+        return ["general"]
+    topics = [f"category:{message['category_id']}"]
+    data = message["data"]
+    if isinstance(data, dict):
+        if "ticket_id" in data:
+            topics.append(f"ticket:{data['ticket_id']}")
+        tickets = [data["ticket"], data["previous"]] if "ticket" in data else [data]
+    else:
+        tickets = data
+    for ticket in tickets:
+        if not ticket or "id" not in ticket:
+            continue
+        topics.append(f"ticket:{ticket['id']}")
+        if ticket.get("worker_id") is not None:
+            topics.append(f"worker:{ticket['worker_id']}")
+    return list(dict.fromkeys(topics))
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[str]:
+    """Messages with the same key within one tick supersede each other: the
+    latest general_queue snapshot, or the latest event of an action for a ticket."""
+    if message["action"] == "general_queue":
+        return "general_queue"
+    data = message["data"]
+    if isinstance(data, dict) and "id" in data:
+        return f"{message['action']}:{data['id']}"
+    return None
+
+
+class ClientConnection:
+    """A websocket with its own bounded outbound queue, drained by a writer task."""
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.topics: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.full_since: Optional[float] = None
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-        self.general_connections: List[WebSocket] = []
+    """Registry of websocket clients and the fan-out of broadcast messages.
+
+    Broadcasts go to the subscribers of the message's topics, plus the legacy
+    clients that never subscribed. ``broadcast`` only enqueues: each
+    connection's writer task does the network I/O, so a stalled display never
+    delays the request that changed a ticket. A connection whose queue stays
+    full for ``full_deadline`` seconds, or whose send takes longer than
+    ``send_timeout``, is closed and dropped.
+
+    With a ``backplane`` attached, every broadcast is also published to the
+    other worker processes, which hand it to ``deliver`` for their own clients.
 
-    async def connect(self, websocket: WebSocket, category_id: int = None):
+    With a ``coalesce_tick``, deliveries are buffered for that many seconds,
+    superseded messages are dropped (see coalesce_key), and each client gets
+    the rest as one ``batch`` frame.
+    """
+
+    def __init__(self, queue_size: int = WS_QUEUE_SIZE, send_timeout: float = WS_SEND_TIMEOUT,
+                 full_deadline: float = WS_SLOW_CONSUMER_DEADLINE, coalesce_tick: float = WS_COALESCE_TICK):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.full_deadline = full_deadline
+        self.coalesce_tick = coalesce_tick
+        self.pending: Dict[Any, Tuple[str, List[str]]] = {}
+        self.pending_sequence = 0
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.topics: Dict[str, Set[ClientConnection]] = {}
+        self.unsubscribed: Set[ClientConnection] = set()
+        self.evicted = 0
+        self.dropped = 0
+        self.backplane = None
+
+    async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        if category_id is None:
-            self.general_connections.append(websocket)
-            print(f"WebSocket connected for general: {websocket}")
-        else:
-            if category_id not in self.active_connections:
-                self.active_connections[category_id] = []
-            self.active_connections[category_id].append(websocket)
-            print(f"WebSocket connected: {websocket}")
-
-    def disconnect(self, websocket: WebSocket, category_id: int = None):
-        if category_id is None:
-            self.general_connections.remove(websocket)
-            print(f"WebSocket disconnected for general: {websocket}")
-        else:
-            if category_id in self.active_connections:
-                self.active_connections[category_id].remove(websocket)
-                if not self.active_connections[category_id]:
-                    del self.active_connections[category_id]
-            print(f"WebSocket disconnected: {websocket}")
-
-    async def broadcast(self, message: Dict[str, Any], category_id: int = None):
-        formatted_message = json.dumps({
+        client = ClientConnection(websocket, self.queue_size)
+        client.writer = asyncio.create_task(self._write(client))
+        self.clients[websocket] = client
+        self.unsubscribed.add(client)
+        print(f"WebSocket connected: {websocket}")
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        if client.writer is not None and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+        self._remove_topics(client, list(client.topics))
+        self.unsubscribed.discard(client)
+        print(f"WebSocket disconnected: {websocket}")
+
+    def subscribe(self, websocket: WebSocket, topics: List[str]):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        for topic in topics:
+            client.topics.add(topic)
+            self.topics.setdefault(topic, set()).add(client)
+        if client.topics:
+            self.unsubscribed.discard(client)
+
+    def unsubscribe(self, websocket: WebSocket, topics: List[str]):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        self._remove_topics(client, topics)
+        if not client.topics:
+            self.unsubscribed.add(client)
+
+    def _remove_topics(self, client: ClientConnection, topics: List[str]):
+        for topic in topics:
+            client.topics.discard(topic)
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.topics[topic]
+
+    def send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Queue a reply to one client behind its pending broadcasts."""
+        client = self.clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, orjson.dumps(message).decode())
+
+    async def broadcast(self, message: Dict[str, Any]):
+        # Encoded once and the same frame queued for every recipient, here and
+        # in the other workers. ASGI text frames are str, so decode once too.
+        formatted_message = orjson.dumps({
             "action": message["action"],
             "category_id": message['category_id'],
             "data": message["data"]
-        })
-        if category_id is None:
-            for connection in self.general_connections:
-                try:
-                    await connection.send_text(formatted_message)
-                except Exception as e:
-                    print(f"Error broadcasting message: {str(e)}")
-        else:
-            if category_id in self.active_connections:
-                for connection in self.active_connections[category_id]:
-                    try:
-                        await connection.send_text(formatted_message)
-                    except Exception as e:
-                        print(f"Error broadcasting message: {str(e)}")
+        }).decode()
+        topics = message_topics(message)
+        key = coalesce_key(message)
+        self.deliver(formatted_message, topics, key)
+        if self.backplane is not None:
+            self.backplane.publish("broadcast", {"message": formatted_message, "topics": topics, "key": key})
+
+    def deliver(self, formatted_message: str, topics: List[str], key: Optional[str] = None):
+        if self.coalesce_tick <= 0:
+            for client in self._recipients(topics):
+                self._enqueue(client, formatted_message)
+            return
+        if key is None:
+            self.pending_sequence += 1
+            key = self.pending_sequence
+        # A superseding message replaces the earlier one and takes its place at the end
+        self.pending.pop(key, None)
+        self.pending[key] = (formatted_message, topics)
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.coalesce_tick, self._flush)
+
+    def _recipients(self, topics: List[str]) -> Set[ClientConnection]:
+        targets = set(self.unsubscribed)
+        for topic in topics:
+            targets.update(self.topics.get(topic, ()))
+        return targets
+
+    def _flush(self):
+        self.flush_handle = None
+        messages = list(self.pending.values())
+        self.pending.clear()
+        by_client: Dict[ClientConnection, List[int]] = {}
+        for index, (_, topics) in enumerate(messages):
+            for client in self._recipients(topics):
+                by_client.setdefault(client, []).append(index)
+        # Clients that receive the same messages share one batch frame
+        frames: Dict[Tuple[int, ...], str] = {}
+        for client, indexes in by_client.items():
+            indexes = tuple(indexes)
+            frame = frames.get(indexes)
+            if frame is None:
+                if len(indexes) == 1:
+                    frame = messages[indexes[0]][0]
+                else:
+                    frame = ('{"action":"batch","category_id":null,"data":['
+                             + ",".join(messages[index][0] for index in indexes) + "]}")
+                frames[indexes] = frame
+            self._enqueue(client, frame)
+
+    def _enqueue(self, client: ClientConnection, formatted_message: str):
+        try:
+            client.queue.put_nowait(formatted_message)
+            client.full_since = None
+        except asyncio.QueueFull:
+            now = time.monotonic()
+            client.dropped += 1
+            self.dropped += 1
+            if client.full_since is None:
+                client.full_since = now
+            elif now - client.full_since > self.full_deadline:
+                self._evict(client, f"queue full for {now - client.full_since:.1f}s, {client.dropped} messages dropped")
+
+    async def _write(self, client: ClientConnection):
+        while True:
+            formatted_message = await client.queue.get()
+            try:
+                await asyncio.wait_for(client.websocket.send_text(formatted_message), self.send_timeout)
+            except asyncio.TimeoutError:
+                self._evict(client, f"send took longer than {self.send_timeout}s")
+                return
+            except Exception as e:
+                print(f"Error broadcasting message: {str(e)}")
+                self._evict(client, "send failed")
+                return
+
+    def _evict(self, client: ClientConnection, reason: str):
+        if client.websocket not in self.clients:
+            return
+        self.evicted += 1
+        logging.warning(f"Dropping slow websocket {client.websocket}: {reason}")
+        self.disconnect(client.websocket)
+        asyncio.create_task(self._close(client.websocket))
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self.clients),
+            "topics": len(self.topics),
+            "unsubscribed_clients": len(self.unsubscribed),
+            "lagging_clients": sum(1 for client in self.clients.values() if client.full_since is not None),
+            "queued_messages": sum(client.queue.qsize() for client in self.clients.values()),
+            "dropped_messages": self.dropped,
+            "evicted_clients": self.evicted,
+            "backplane_dropped": self.backplane.dropped if self.backplane is not None else 0,
+        }
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), self.send_timeout)
+        except Exception:
+            pass
 
 
 manager = ConnectionManager()
@@ -61,17 +263,31 @@ manager = ConnectionManager()
 
 @router.websocket("/")
 async def websocket_endpoint(websocket: WebSocket):
-    category_id = None
-    await manager.connect(websocket, category_id)
+    """Clients subscribe with ``{"action": "subscribe", "topics": ["category:1", ...]}``
+    and leave topics with ``"unsubscribe"``; see TOPIC_PATTERN for valid topics."""
+    await manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_json()
             print(f"Received message: {data}")
-            if "category_id" in data:
-                category_id = data["category_id"]
-            # Обработка входящих сообщений если необходимо
+            action = data.get("action") if isinstance(data, dict) else None
+            if action in ("subscribe", "unsubscribe"):
+                topics = data.get("topics")
+                if not isinstance(topics, list) or not all(
+                        isinstance(topic, str) and TOPIC_PATTERN.match(topic) for topic in topics):
+                    manager.send(websocket, {"action": "error", "detail": "Invalid topics"})
+                    continue
+                if action == "subscribe":
+                    manager.subscribe(websocket, topics)
+                else:
+                    manager.unsubscribe(websocket, topics)
+                manager.send(websocket, {"action": action + "d", "topics": topics})
+            elif isinstance(data, dict) and isinstance(data.get("category_id"), int):
+                # Старый формат: {"category_id": 1} подписывает на очередь категории
+                manager.subscribe(websocket, [f"category:{data['category_id']}"])
     except WebSocketDisconnect:
-        manager.disconnect(websocket, category_id)
+        manager.disconnect(websocket)
         print("WebSocket connection closed")
     except Exception as e:
+        manager.disconnect(websocket)
         print(f"WebSocket error: {str(e)}")
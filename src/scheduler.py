@@ -11,6 +11,10 @@ import os
 sys.path.append(os.path.join(sys.path[0], '../'))
 from src.routes.global_counter.counter import nullify_counter  # Ensure this is asynchronous if needed
 from src.database import get_async_session, async_session_maker
+from src.routes.ticket.partitions import ensure_partitions, archive_partitions
+from src.routes.statistics.stats import reconcile_totals
+from src.routes.websocket.backplane import backplane
+from src.config import TICKETS_ARCHIVE_AFTER_MONTHS
 
 sys.path.append(os.path.join(sys.path[0], '../'))
 from telegram_bot.main import bot
@@ -26,9 +30,24 @@ def greeting():
 async def check_time():
     async with async_session_maker() as session:
         count = await nullify_counter(session)
+        # The workers keep their own queue indexes; this process has no backplane running
+        try:
+            await backplane.notify("queue", ["clear_waiting"])
+        except Exception as e:
+            logging.error(f"Failed to notify the workers of the queue reset: {str(e)}")
         if count:
             await bot.send_message(-1002245461718,"Сетчик сброшен✅")
 
+        await ensure_partitions(session)
+        if TICKETS_ARCHIVE_AFTER_MONTHS:
+            archived = await archive_partitions(session, int(TICKETS_ARCHIVE_AFTER_MONTHS))
+            if archived:
+                logging.info(f"Archived ticket partitions: {archived}")
+
+        corrections = await reconcile_totals(session)
+        for category_id, status, stored, actual in corrections:
+            logging.warning(f"ticket_totals drift for category {category_id}, {status}: {stored} -> {actual}")
+
 
 schedule.every().day.at("18:00").do(greeting)
 # schedule.every(10).seconds.do(greeting)
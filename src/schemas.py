@@ -49,6 +49,9 @@ class ResponseTicket(BaseModel):
     ticket_created_time: str
     category_id: int
     average_duration: Optional[float]
+    estimated_wait: Optional[float] = None
+    median_duration: Optional[float] = None
+    p90_duration: Optional[float] = None
 
 class Personal_data(BaseModel):
     user: UserOut
@@ -109,4 +112,19 @@ class Statistic(BaseModel):
 class StatisticResponse(BaseModel):
     general_data: Statistic # category name maybe null or ''
     categories: list[Statistic]
-    today: str
\ No newline at end of file
+    today: str
+class ReportPeriod(BaseModel):
+    total: int
+    by_status: dict[str, int]
+    average_service_seconds: Optional[float]
+    p90_service_seconds: Optional[float]
+    average_rate: Optional[float]
+
+class ReportDay(ReportPeriod):
+    day: str
+
+class WorkerReport(ReportPeriod):
+    worker_id: int
+    date_from: str
+    date_to: str
+    days: list[ReportDay]
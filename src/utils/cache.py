@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class ResponseCache:
+    """Short-lived in-process cache for computed responses.
+
+    Entries expire after ``ttl`` seconds or on ``invalidate``. Concurrent misses
+    for the same key share one computation (single-flight), and a result that
+    was computed across an invalidation is returned but not stored.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self.entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self.inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        inflight = self.inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader was cancelled, not us: compute it ourselves
+                return await self.get_or_compute(key, compute)
+
+        self.misses += 1
+        version = self.version
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            value = await compute()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if version == self.version:
+                self._evict_expired()
+                self.entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            # A cancelled leader still has to wake the callers waiting on it
+            if not future.done():
+                future.cancel()
+            if self.inflight.get(key) is future:
+                del self.inflight[key]
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self.entries.items() if expires <= now]:
+            del self.entries[key]
+
+    def invalidate(self):
+        self.version += 1
+        self.entries.clear()
+        # Later callers start a fresh computation instead of joining a stale one
+        self.inflight.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "entries": len(self.entries),
+            "ttl": self.ttl,
+        }
@@ -0,0 +1,54 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.routes.ticket.models import Ticket
+
+# Keyset pagination over tickets ordered by (created_at, id). The cursor is the
+# key of the last row of the previous page, so every page is an index range
+# scan that starts where the previous one stopped, however deep the page is.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{ticket_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, ticket_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def paginate_tickets(db: AsyncSession, query, cursor: Optional[str] = None,
+                           limit: int = DEFAULT_PAGE_SIZE, descending: bool = True):
+    """Run ``query`` for one page and return ``(rows, next_cursor)``.
+
+    ``query`` selects ticket columns (see select_ticket_rows) including
+    created_at and id.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    key = tuple_(Ticket.created_at, Ticket.id)
+    if cursor is not None:
+        after = tuple_(*decode_cursor(cursor))
+        query = query.where(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    else:
+        query = query.order_by(Ticket.created_at, Ticket.id)
+
+    result = await db.execute(query.limit(limit + 1))
+    tickets = result.all()
+    if len(tickets) <= limit:
+        return tickets, None
+    tickets = tickets[:limit]
+    return tickets, encode_cursor(tickets[-1].created_at, tickets[-1].id)
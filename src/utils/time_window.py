@@ -0,0 +1,69 @@
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional
+
+from src.routes.ticket.models import current_time_plus_5
+
+# Ticket timestamps are stored as naive local time (UTC+5, see current_time_plus_5),
+# so window boundaries are computed on the same clock and compared without tzinfo.
+
+
+class Window(NamedTuple):
+    """Half-open local time range ``[start, end)``."""
+    start: datetime
+    end: datetime
+
+    @property
+    def first_day(self) -> date:
+        return self.start.date()
+
+    @property
+    def end_day(self) -> date:
+        """First day after the window (exclusive bound for date columns)."""
+        if self.end.time() == time.min:
+            return self.end.date()
+        return self.end.date() + timedelta(days=1)
+
+    def where(self, column, day_column=None) -> list:
+        """``column >= start AND column < end`` plus a ``day_column`` bound for partition pruning."""
+        criteria = [column >= self.start, column < self.end]
+        if day_column is not None:
+            criteria += self.days(day_column)
+        return criteria
+
+    def days(self, day_column) -> list:
+        return [day_column >= self.first_day, day_column < self.end_day]
+
+
+class TimeWindows:
+    """Current local day boundaries, recomputed once the day rolls over, and windows relative to them."""
+
+    def __init__(self):
+        self._day: Optional[date] = None
+        self._today: Optional[Window] = None
+
+    def now(self) -> datetime:
+        return current_time_plus_5()
+
+    def _refresh(self):
+        day = self.now().date()
+        if day == self._day:
+            return
+        start = datetime.combine(day, time.min)
+        self._today = Window(start, start + timedelta(days=1))
+        self._day = day
+
+    def today(self) -> Window:
+        self._refresh()
+        return self._today
+
+    def last_days(self, days: int) -> Window:
+        """The last ``days`` whole days before today, plus today."""
+        today = self.today()
+        return Window(today.start - timedelta(days=days), today.end)
+
+    def trailing(self, delta: timedelta) -> Window:
+        """From ``delta`` ago up to the end of today."""
+        return Window(self.now() - delta, self.today().end)
+
+
+time_windows = TimeWindows()
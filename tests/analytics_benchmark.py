@@ -0,0 +1,117 @@
+"""Cost of the /interface/admin/analytics snapshot, against the database from .env.
+
+Seeds SEED_ROWS tickets (1M by default) over the last DAYS days in one
+transaction that is rolled back at the end. Compares the old fetch of
+SQLAlchemy rows turned into a float array with the binary COPY of
+load_snapshot, then times parsing and aggregating the snapshot, the part
+build_analytics runs in a thread.
+
+    python tests/analytics_benchmark.py [rows]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+
+import numpy as np
+from sqlalchemy import case, extract, func, text
+from sqlalchemy.future import select
+
+from src.database import async_session_maker, engine
+from src.routes.statistics.analytics import STATUSES, compute_analytics, load_snapshot, parse_snapshot
+from src.routes.ticket.models import Ticket
+from src.routes.ticket.partitions import add_months, ensure_partitions, month_start, partition_name
+from src.utils.time_window import Window, time_windows
+
+SEED_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+DAYS = 30
+CATEGORIES = 10
+
+SEED = """
+INSERT INTO tickets (full_name, phone_number, created_at, created_day, start_time, end_time,
+                     category_id, status, number, language, worker_id, token)
+SELECT 'Analytics seed ' || g, '+7' || lpad(g::text, 10, '0'), ts, ts::date,
+       ts + (g % 900) * interval '1 second',
+       CASE WHEN g % 10 = 0 THEN NULL ELSE ts + (900 + g % 1200) * interval '1 second' END,
+       (CAST(:categories AS integer[]))[1 + g % :category_count],
+       CASE WHEN g % 10 = 0 THEN 'skipped' ELSE 'completed' END,
+       lpad((g % 1000)::text, 3, '0'), 'Русский', NULL, md5('analytics seed ' || g)
+FROM generate_series(1, :rows) AS g,
+     LATERAL (SELECT CAST(:start AS timestamp) + (g % (:days * 86400)) * interval '1 second' AS ts) AS t
+"""
+
+
+async def orm_snapshot(db, window: Window) -> np.ndarray:
+    """load_snapshot as it was: SQLAlchemy rows of Decimal epochs, converted by numpy."""
+    result = await db.execute(
+        select(
+            extract("epoch", Ticket.created_at),
+            extract("epoch", Ticket.start_time),
+            extract("epoch", Ticket.end_time),
+            Ticket.category_id,
+            func.coalesce(Ticket.worker_id, 0),
+            case({status: index for index, status in enumerate(STATUSES)}, value=Ticket.status, else_=-1),
+        ).where(*window.where(Ticket.created_at, Ticket.created_day))
+    )
+    return np.array(result.all(), dtype=float)
+
+
+def timed(started: float) -> str:
+    return f"{(time.perf_counter() - started) * 1000:8.0f} ms"
+
+
+async def main():
+    async with async_session_maker() as db:
+        await ensure_partitions(db)
+
+    today = time_windows.today()
+    window = Window(today.start - timedelta(days=DAYS), today.start)
+    async with async_session_maker() as db:
+        try:
+            # Partitions for the seeded past months, rolled back with the rows
+            month = month_start(window.first_day)
+            while month < month_start(today.first_day):
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name('tickets', month)} "
+                    f"PARTITION OF tickets FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+                ))
+                month = add_months(month, 1)
+            category_ids = (await db.execute(text(
+                "INSERT INTO categories (name) SELECT 'Analytics seed ' || g FROM generate_series(1, :n) AS g RETURNING id"
+            ), {"n": CATEGORIES})).scalars().all()
+
+            started = time.perf_counter()
+            await db.execute(text(SEED), {
+                "categories": category_ids, "category_count": CATEGORIES,
+                "start": window.start, "days": DAYS, "rows": SEED_ROWS,
+            })
+            print(f"Seeded {SEED_ROWS} tickets in {time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            old = await orm_snapshot(db, window)
+            print(f"  fetch, SQLAlchemy rows:  {timed(started)}")
+
+            started = time.perf_counter()
+            data = await load_snapshot(db, window)
+            print(f"  fetch, binary COPY:      {timed(started)}")
+
+            started = time.perf_counter()
+            snapshot = parse_snapshot(data)
+            print(f"  parse:                   {timed(started)}")
+            started = time.perf_counter()
+            compute_analytics(snapshot)
+            print(f"  aggregate:               {timed(started)}")
+            print(f"{snapshot.shape[0]} tickets in the window")
+
+            # Neither fetch is ordered; NaNs compare equal
+            np.testing.assert_array_equal(old[np.lexsort(old.T)], snapshot[np.lexsort(snapshot.T)])
+        finally:
+            await db.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Propagation latency of the LISTEN/NOTIFY backplane between worker processes.
+
+Needs the database from .env. Starts PROCESSES processes with their own
+PostgresBackplane; the first one publishes MESSAGES events of each size and
+the others report how long each took to arrive.
+
+    python tests/backplane_benchmark.py
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+
+from src.routes.websocket.backplane import PostgresBackplane
+
+PROCESSES = 4
+MESSAGES = 500
+SIZES = [200, 5000, 50000]
+CHANNEL = "backplane_benchmark"
+
+
+async def run(index: int, ready, start, results):
+    backplane = PostgresBackplane(CHANNEL)
+    latencies = {size: [] for size in SIZES}
+    done = asyncio.Event()
+    expected = MESSAGES * len(SIZES)
+
+    def received(event):
+        latencies[event["size"]].append(time.time() - event["sent"])
+        if sum(len(values) for values in latencies.values()) == expected:
+            done.set()
+
+    backplane.subscribe("benchmark", received)
+    await backplane.start()
+    ready.put(index)
+
+    if index == 0:
+        start.wait()
+        for size in SIZES:
+            padding = "x" * size
+            for _ in range(MESSAGES):
+                backplane.publish("benchmark", {"size": size, "sent": time.time(), "padding": padding})
+                # Let the publisher task drain instead of filling the queue at once
+                await asyncio.sleep(0)
+        while not backplane.queue.empty():
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(1)
+    else:
+        try:
+            await asyncio.wait_for(done.wait(), 120)
+        except asyncio.TimeoutError:
+            pass
+        results.put((index, latencies))
+    await backplane.stop()
+
+
+def worker(index: int, ready, start, results):
+    asyncio.run(run(index, ready, start, results))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else float("nan")
+
+
+if __name__ == "__main__":
+    ready, results = multiprocessing.Queue(), multiprocessing.Queue()
+    start = multiprocessing.Event()
+    processes = [multiprocessing.Process(target=worker, args=(i, ready, start, results)) for i in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+    start.set()
+
+    for _ in range(PROCESSES - 1):
+        index, latencies = results.get()
+        for size in SIZES:
+            values = latencies[size]
+            print(f"process {index} size {size:>6}: received {len(values)}/{MESSAGES}, "
+                  f"p50 {percentile(values, 0.5):.2f} ms, p99 {percentile(values, 0.99):.2f} ms")
+            assert len(values) == MESSAGES, "messages were lost"
+    for process in processes:
+        process.join()
@@ -0,0 +1,67 @@
+"""Encode and fan-out cost of websocket broadcasts, no database needed.
+
+Compares json.dumps with orjson for a general_queue snapshot and times
+ConnectionManager.broadcast to 1k and 10k subscribers over fake sockets.
+
+    python tests/broadcast_benchmark.py
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import timeit
+
+import orjson
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+
+import src.routes.websocket.router as websocket_router
+from src.routes.websocket.router import ConnectionManager
+
+SNAPSHOT_TICKETS = 500
+SUBSCRIBERS = [1000, 10000]
+BROADCASTS = 20
+
+TICKETS = [{
+    "id": i, "full_name": "Иванов Иван Иванович", "phone_number": "+77001234567",
+    "created_at": "2026-01-01 09:00:00", "category_id": i % 5, "status": "wait", "number": f"{i:03d}",
+    "rate": None, "worker_id": None, "language": "Русский", "token": "x" * 32,
+} for i in range(SNAPSHOT_TICKETS)]
+MESSAGE = {"action": "general_queue", "category_id": None, "data": TICKETS}
+
+
+class FakeWebSocket:
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        pass
+
+
+def best_of(function, number: int = 100) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1000
+
+
+async def fan_out(subscribers: int) -> float:
+    manager = ConnectionManager(queue_size=BROADCASTS + 1)
+    for _ in range(subscribers):
+        await manager.connect(FakeWebSocket())
+    # Measure the enqueueing done by broadcast, not the writer tasks
+    for client in manager.clients.values():
+        client.writer.cancel()
+    started = time.perf_counter()
+    for _ in range(BROADCASTS):
+        await manager.broadcast(MESSAGE)
+    return (time.perf_counter() - started) / BROADCASTS * 1000
+
+
+if __name__ == "__main__":
+    websocket_router.print = lambda *args, **kwargs: None
+    size = len(orjson.dumps(MESSAGE))
+    print(f"general_queue of {SNAPSHOT_TICKETS} tickets, {size} bytes")
+    print(f"  json.dumps:           {best_of(lambda: json.dumps(MESSAGE)):.3f} ms")
+    print(f"  orjson.dumps:         {best_of(lambda: orjson.dumps(MESSAGE)):.3f} ms")
+    print(f"  orjson.dumps+decode:  {best_of(lambda: orjson.dumps(MESSAGE).decode()):.3f} ms")
+    for subscribers in SUBSCRIBERS:
+        print(f"broadcast to {subscribers} subscribers: {asyncio.run(fan_out(subscribers)):.2f} ms")
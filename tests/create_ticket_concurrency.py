@@ -0,0 +1,101 @@
+"""create_ticket against the database from .env.
+
+1. 50 concurrent calls, each in its own session as concurrent requests are.
+   Checks that the allocated numbers are unique and contiguous and prints
+   the throughput.
+2. SEQUENTIAL_CALLS calls on one pooled connection, every other one a
+   duplicate of the previous client. asyncpg reuses its prepared statements
+   and PostgreSQL switches them to a generic plan after 5 executions, so
+   this catches an ON CONFLICT that stops matching the partial unique index
+   on a warm connection.
+
+The tickets and the temporary category are deleted afterwards.
+
+    python tests/create_ticket_concurrency.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import DATABASE_URL, async_session_maker, engine
+from src.routes.category.models import Category
+from src.routes.ticket.ticket import create_ticket, delete_ticket
+
+CONCURRENCY = 50
+SEQUENTIAL_CALLS = 12
+
+
+def client(category_id: int, index: int) -> dict:
+    return {
+        "full_name": f"Concurrency test {index}",
+        "phone_number": f"+7000000{index:04d}",
+        "category_id": category_id,
+        "language": "ru",
+    }
+
+
+async def create(category_id: int, index: int):
+    async with async_session_maker() as db:
+        return await create_ticket(db, client(category_id, index))
+
+
+async def concurrent_creates(category_id: int) -> list:
+    started = time.perf_counter()
+    tickets = await asyncio.gather(*(create(category_id, index) for index in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - started
+
+    numbers = sorted(int(ticket.number) for ticket in tickets)
+    print(f"{CONCURRENCY} concurrent tickets in {elapsed:.3f}s ({CONCURRENCY / elapsed:.0f}/s), "
+          f"numbers {numbers[0]}..{numbers[-1]}")
+    assert len(set(numbers)) == CONCURRENCY, "duplicate ticket numbers"
+    assert numbers[-1] - numbers[0] == CONCURRENCY - 1, "gaps in ticket numbers"
+    return list(tickets)
+
+
+async def sequential_creates(category_id: int, tickets: list):
+    # One connection, so every call runs the same prepared INSERT
+    single_engine = create_async_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+    single_session_maker = sessionmaker(bind=single_engine, class_=AsyncSession, expire_on_commit=False)
+    created = len(tickets)
+    try:
+        for call in range(SEQUENTIAL_CALLS):
+            index = CONCURRENCY + call // 2
+            async with single_session_maker() as db:
+                ticket = await create_ticket(db, client(category_id, index))
+            if call % 2:
+                assert ticket.id == tickets[-1].id, f"call {call + 1}: duplicate was not deduplicated"
+            else:
+                tickets.append(ticket)
+    finally:
+        await single_engine.dispose()
+    print(f"{SEQUENTIAL_CALLS} sequential creates on one connection, {len(tickets) - created} tickets after dedup")
+
+
+async def main():
+    async with async_session_maker() as db:
+        category = Category(name="Concurrency test")
+        db.add(category)
+        await db.commit()
+        category_id = category.id
+
+    tickets = []
+    try:
+        tickets += await concurrent_creates(category_id)
+        await sequential_creates(category_id, tickets)
+    finally:
+        async with async_session_maker() as db:
+            for ticket in tickets:
+                await delete_ticket(db, ticket.id)
+            await db.delete(await db.get(Category, category_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,201 @@
+"""Worker dashboard latency at 50 concurrent workers, against the database from .env.
+
+Compares the old dashboard (a query per counter plus the category and current
+ticket lookups) with get_dashboard, which reads every counter, the category
+and the current ticket in one statement. Seeds SEED_ROWS of today's tickets
+(100k by default) and their ticket_daily_stats rows for a temporary category
+and WORKERS workers, checks both versions return the same dashboard, then
+runs ROUNDS rounds of WORKERS concurrent requests each, every one in its own
+session. The seeded rows are deleted afterwards.
+
+    python tests/dashboard_benchmark.py [rows]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+
+from sqlalchemy import delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+import src.routes.auth.auth as auth
+import src.routes.interface.router as interface_router
+from src.database import DATABASE_URL
+from src.routes.auth.models import User
+from src.routes.category.models import Category
+from src.routes.interface.router import get_dashboard
+from src.routes.statistics.models import TicketDailyStats
+from src.routes.ticket.models import Ticket
+from src.routes.ticket.partitions import ensure_partitions
+from src.routes.ticket.queue import queue_index
+from src.routes.ticket.schemas import TicketOut
+from src.schemas import CurrentTicketWorker, Dashboard, General_data, Personal_data
+from src.utils.time_window import time_windows
+
+SEED_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+WORKERS = 50
+ROUNDS = 20
+
+# Every worker gets one invited ticket, the rest are spread over the app's today
+SEED = """
+INSERT INTO tickets (full_name, phone_number, created_at, created_day, start_time, end_time,
+                     category_id, status, number, language, worker_id, token)
+SELECT 'Dashboard seed ' || g, '+7' || lpad(g::text, 10, '0'), ts, ts::date,
+       CASE WHEN status = 'wait' THEN NULL ELSE ts + interval '1 minute' END,
+       CASE WHEN status IN ('completed', 'skipped') THEN ts + interval '5 minutes' END,
+       :category_id, status, lpad((g % 1000)::text, 3, '0'), 'Русский',
+       CASE WHEN status = 'wait' THEN NULL ELSE (CAST(:workers AS integer[]))[1 + g % :worker_count] END,
+       md5('dashboard seed ' || g)
+FROM generate_series(1, :rows) AS g,
+     LATERAL (SELECT CAST(:today AS timestamp) + (g % 36000) * interval '1 second' AS ts,
+                     CASE WHEN g <= :worker_count THEN 'invited'
+                          WHEN g % 10 = 0 THEN 'wait'
+                          WHEN g % 10 = 1 THEN 'skipped'
+                          ELSE 'completed' END AS status) AS t
+"""
+
+SEED_STATS = """
+INSERT INTO ticket_daily_stats (day, category_id, worker_id, status, count, total_service_seconds)
+SELECT created_day, category_id, coalesce(worker_id, 0), status, count(*),
+       coalesce(sum(extract(epoch FROM end_time - start_time)) FILTER (WHERE status = 'completed'), 0)
+FROM tickets WHERE category_id = :category_id
+GROUP BY created_day, category_id, coalesce(worker_id, 0), status
+"""
+
+
+class DashboardRequest:
+    def __init__(self, token: str):
+        self.token = token
+
+    async def json(self):
+        return {"token": self.token}
+
+
+async def old_dashboard(db: AsyncSession, token: str) -> Dashboard:
+    """get_dashboard as it was before the single statement, without the prints."""
+    worker = await auth.get_current_user(db, token)
+    category = (await db.execute(select(Category).where(Category.id == worker.category_id))).scalars().first()
+    today = time_windows.today().first_day
+
+    async def count(*criteria):
+        return (await db.execute(select(func.count(Ticket.id)).where(*criteria))).scalar()
+
+    accepted = Ticket.status.in_(["invited", "completed", "skipped"])
+    personal_data = Personal_data(
+        user=worker,
+        accepted_today=await count(Ticket.worker_id == worker.id, accepted, Ticket.created_day == today),
+        skipped_today=await count(Ticket.worker_id == worker.id, Ticket.status == "skipped", Ticket.created_day == today),
+        served_today=await count(Ticket.worker_id == worker.id, Ticket.status == "completed", Ticket.created_day == today),
+    )
+    general_data = General_data(
+        clients_in_queue=await count(Ticket.category_id == worker.category_id, Ticket.status == "wait"),
+        accepted_today=await count(Ticket.category_id == worker.category_id, accepted, Ticket.created_day == today),
+        served_today=await count(Ticket.category_id == worker.category_id, Ticket.status == "completed",
+                                 Ticket.created_day == today),
+    )
+    current_ticket = (await db.execute(
+        select(Ticket).where(Ticket.worker_id == worker.id, Ticket.status == "invited")
+    )).scalars().first()
+
+    current_ticket_worker = None
+    if current_ticket:
+        current_ticket_worker = CurrentTicketWorker(
+            ticket_data=TicketOut.from_orm(current_ticket),
+            ticket_id=current_ticket.id,
+            ticket_number=current_ticket.number,
+            category_name=category.name,
+            ticket_created_time=current_ticket.created_at.strftime("%d.%m.%Y %H:%M"),
+            ticket_language=current_ticket.language,
+            ticket_phone_number=current_ticket.phone_number,
+            ticket_full_name=current_ticket.full_name
+        )
+    return Dashboard(
+        category_name=category.name,
+        personal_data=personal_data,
+        general_data=general_data,
+        current_ticket=current_ticket_worker
+    )
+
+
+async def new_dashboard(db: AsyncSession, token: str) -> Dashboard:
+    return await get_dashboard(DashboardRequest(token), db)
+
+
+async def timed(session_maker, dashboard, token: str) -> float:
+    started = time.perf_counter()
+    async with session_maker() as db:
+        await dashboard(db, token)
+    return time.perf_counter() - started
+
+
+async def benchmark(session_maker, dashboard, tokens: list) -> tuple:
+    await asyncio.gather(*(timed(session_maker, dashboard, token) for token in tokens))  # warm-up
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        latencies += await asyncio.gather(*(timed(session_maker, dashboard, token) for token in tokens))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency * 1000 for latency in latencies)
+    return len(latencies) / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+async def main():
+    auth.print = interface_router.print = lambda *args, **kwargs: None
+    # One connection per concurrent worker, so the pool does not serialize them
+    engine = create_async_engine(DATABASE_URL, pool_size=WORKERS, max_overflow=0)
+    session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_maker() as db:
+        await ensure_partitions(db)
+        category = Category(name="Dashboard benchmark")
+        db.add(category)
+        await db.flush()
+        category_id = category.id
+        workers = [
+            User(first_name="Dashboard", last_name=f"Benchmark {i}", email=f"dashboard-benchmark-{i}@example.invalid",
+                 token=f"dashboard-benchmark-{i}", category_id=category_id)
+            for i in range(WORKERS)
+        ]
+        db.add_all(workers)
+        await db.commit()
+        worker_ids = [worker.id for worker in workers]
+        tokens = [worker.token for worker in workers]
+
+    try:
+        async with session_maker() as db:
+            started = time.perf_counter()
+            await db.execute(text(SEED), {
+                "today": time_windows.today().start, "category_id": category_id,
+                "workers": worker_ids, "worker_count": WORKERS, "rows": SEED_ROWS,
+            })
+            await db.execute(text(SEED_STATS), {"category_id": category_id})
+            await db.execute(text("ANALYZE tickets"))
+            await db.execute(text("ANALYZE ticket_daily_stats"))
+            await db.commit()
+            print(f"Seeded {SEED_ROWS} tickets in {time.perf_counter() - started:.1f}s")
+            await queue_index.rebuild(db)
+
+            assert (await old_dashboard(db, tokens[0])).model_dump() == (await new_dashboard(db, tokens[0])).model_dump(), \
+                "the dashboards differ"
+
+        print(f"{WORKERS} concurrent workers, {ROUNDS} rounds")
+        for name, dashboard in (("old, query per counter", old_dashboard), ("new, single statement", new_dashboard)):
+            throughput, median, p95 = await benchmark(session_maker, dashboard, tokens)
+            print(f"  {name}: {throughput:7.0f} req/s, median {median:6.1f} ms, p95 {p95:6.1f} ms")
+    finally:
+        async with session_maker() as db:
+            await db.execute(delete(Ticket).where(Ticket.category_id == category_id))
+            await db.execute(delete(TicketDailyStats).where(TicketDailyStats.category_id == category_id))
+            await db.execute(delete(User).where(User.id.in_(worker_ids)))
+            await db.execute(delete(Category).where(Category.id == category_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""Check that the planner uses the ticket hot path indexes on a seeded table.
+
+Needs the migrated database from .env. Seeds SEED_ROWS tickets (1M by default)
+over the current month for temporary categories and workers, runs ANALYZE and
+asserts the EXPLAIN plan of each hot path query scans the expected index and
+no ticket partition sequentially. Everything runs in one transaction that is
+rolled back at the end.
+
+    python tests/explain_indexes.py [rows]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+
+from src.database import async_session_maker, engine
+from src.routes.ticket.models import Ticket
+from src.routes.ticket.partitions import ensure_partitions
+
+SEED_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+CATEGORIES = 10
+WORKERS = 20
+
+SEED = """
+INSERT INTO tickets (full_name, phone_number, created_at, created_day, start_time, end_time,
+                     category_id, status, number, language, worker_id, token)
+SELECT 'Explain seed ' || g, '+7' || lpad(g::text, 10, '0'), ts, ts::date,
+       CASE WHEN g % 100 = 0 THEN NULL ELSE ts + interval '5 minutes' END,
+       CASE WHEN g % 100 <= 1 THEN NULL ELSE ts + interval '15 minutes' END,
+       (CAST(:categories AS integer[]))[1 + g % :category_count],
+       CASE WHEN g % 100 = 0 THEN 'wait' WHEN g % 100 = 1 THEN 'invited' ELSE 'completed' END,
+       lpad((g % 1000)::text, 3, '0'), 'Русский',
+       CASE WHEN g % 100 = 0 THEN NULL ELSE (CAST(:workers AS integer[]))[1 + g % :worker_count] END,
+       md5(g::text)
+FROM generate_series(1, :rows) AS g,
+     LATERAL (SELECT date_trunc('month', current_date)
+                     + (g % extract(day FROM current_date)::int) * interval '1 day'
+                     + (g % 36000) * interval '1 second' AS ts) AS t
+"""
+
+
+def hot_path_queries(category_id: int, worker_id: int, token: str):
+    """``(description, expected index, statement)`` for the queries the indexes were built for."""
+    return [
+        ("dispatch: next waiting ticket", "ix_tickets_wait_queue",
+         select(Ticket.id)
+         .where(Ticket.category_id == category_id, Ticket.status == "wait", Ticket.worker_id == None)
+         .order_by(Ticket.created_at, Ticket.id)
+         .limit(1)
+         .with_for_update(skip_locked=True)),
+        ("dashboard: worker's current ticket", "ix_tickets_invited_worker",
+         select(Ticket).where(Ticket.worker_id == worker_id, Ticket.status == "invited")),
+        ("dashboard: now serving in a category", "ix_tickets_invited_category",
+         select(Ticket.number)
+         .where(Ticket.category_id == category_id, Ticket.status == "invited")
+         .order_by(Ticket.created_at.desc())
+         .limit(1)),
+        ("telegram: ticket by token", "ix_tickets_token",
+         select(Ticket).where(Ticket.token == token)),
+        ("worker ticket list page", "ix_tickets_worker_created",
+         select(Ticket.id)
+         .where(Ticket.worker_id == worker_id)
+         .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+         .limit(100)),
+    ]
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def main():
+    async with async_session_maker() as session:
+        await ensure_partitions(session)
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            category_ids = (await conn.execute(text(
+                "INSERT INTO categories (name) SELECT 'Explain seed ' || g FROM generate_series(1, :n) AS g RETURNING id"
+            ), {"n": CATEGORIES})).scalars().all()
+            worker_ids = (await conn.execute(text(
+                "INSERT INTO users (first_name, last_name, email) "
+                "SELECT 'Explain', 'Seed', 'explain-seed-' || g || '@example.invalid' "
+                "FROM generate_series(1, :n) AS g RETURNING id"
+            ), {"n": WORKERS})).scalars().all()
+
+            started = time.perf_counter()
+            await conn.execute(text(SEED), {
+                "categories": category_ids, "category_count": CATEGORIES,
+                "workers": worker_ids, "worker_count": WORKERS, "rows": SEED_ROWS,
+            })
+            await conn.execute(text("ANALYZE tickets"))
+            print(f"Seeded and analyzed {SEED_ROWS} tickets in {time.perf_counter() - started:.1f}s")
+
+            failures = []
+            # md5('1'), the token of the first seeded ticket
+            queries = hot_path_queries(category_ids[0], worker_ids[0], "c4ca4238a0b923820dcc509a6f75849b")
+            for description, index, stmt in queries:
+                # The plan names the partition indexes attached to the partitioned one
+                allowed = set((await conn.execute(text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                    "WHERE p.relname = :index"
+                ), {"index": index})).scalars().all()) | {index}
+
+                sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+                plan = (await conn.execute(text("EXPLAIN (FORMAT JSON) " + sql))).scalar()[0]["Plan"]
+                nodes = list(plan_nodes(plan))
+                used = {node["Index Name"] for node in nodes if "Index Name" in node}
+                seq_scans = {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}
+
+                ok = bool(used & allowed) and not seq_scans
+                print(f"{'ok  ' if ok else 'FAIL'} {description}: indexes {sorted(used)}"
+                      + (f", seq scans {sorted(seq_scans)}" if seq_scans else ""))
+                if not ok:
+                    failures.append(description)
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+    assert not failures, f"planner did not use the expected index for: {', '.join(failures)}"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
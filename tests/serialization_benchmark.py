@@ -0,0 +1,62 @@
+"""Serialization cost of ticket lists, no running database needed (.env is still read).
+
+Compares the old per-entity TicketOut.from_orm(...).dict() path with the
+row dicts validated in one TypeAdapter call (src/routes/ticket/serialization.py)
+for 10k tickets, both for the websocket payload and for a page response body.
+
+    python tests/serialization_benchmark.py
+"""
+import json
+import os
+import sys
+import timeit
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+
+from src.routes.ticket.models import Ticket
+from src.routes.ticket.schemas import TicketOut, TicketPage
+from src.routes.ticket.serialization import TICKET_OUT_COLUMNS, ticket_page_response, tickets_out_json
+
+ROWS = 10000
+
+TicketRow = namedtuple("TicketRow", [column.key for column in TICKET_OUT_COLUMNS])
+
+
+def ticket_values(i: int) -> dict:
+    return {
+        "id": i, "full_name": "Иванов Иван Иванович", "phone_number": "+77001234567",
+        "created_at": datetime(2026, 1, 1, 9) + timedelta(seconds=i), "category_id": i % 5,
+        "status": "wait", "number": f"{i % 1000:03d}", "rate": None, "worker_id": None,
+        "language": "Русский", "token": "x" * 32,
+    }
+
+
+def best_of(function, number: int = 5) -> float:
+    return min(timeit.repeat(function, number=number, repeat=3)) / number * 1000
+
+
+if __name__ == "__main__":
+    entities = [Ticket(**ticket_values(i), created_day=date(2026, 1, 1)) for i in range(ROWS)]
+    rows = [TicketRow(**ticket_values(i)) for i in range(ROWS)]
+
+    def orm_payload():
+        return json.dumps([TicketOut.from_orm(ticket).dict() for ticket in entities])
+
+    def row_payload():
+        return json.dumps(tickets_out_json(rows))
+
+    def orm_page():
+        # The old endpoints returned entities and FastAPI validated and dumped them
+        return TicketPage(items=[TicketOut.from_orm(ticket) for ticket in entities], next_cursor=None).model_dump_json()
+
+    def row_page():
+        return ticket_page_response(rows, None).body
+
+    assert json.loads(orm_payload()) == json.loads(row_payload())
+    print(f"{ROWS} tickets")
+    print(f"  websocket payload, ORM from_orm: {best_of(orm_payload):8.1f} ms")
+    print(f"  websocket payload, row adapter:  {best_of(row_payload):8.1f} ms")
+    print(f"  page body, ORM from_orm:         {best_of(orm_page):8.1f} ms")
+    print(f"  page body, row adapter:          {best_of(row_page):8.1f} ms")